@@ -0,0 +1,85 @@
+"""
+Decode and parse cost per page: ``response.text`` against EncodingResolver.
+
+Pages are served without a charset in the Content-Type header, which is when
+requests falls back to charset detection over the whole body.
+
+Run from the repository root:
+    python -m benchmarks.bench_decode --pages 50 --size 200
+"""
+import argparse
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from requests.structures import CaseInsensitiveDict
+
+from producer_consumer.encoding import EncodingResolver
+
+
+PARAGRAPH = "Příliš žluťoučký kůň úpěl ďábelské ódy. Vláda dnes schválila státní rozpočet na příští rok. "
+
+
+def make_page(size_kb, encoding, declare_meta):
+    meta = f'<meta charset="{encoding}">' if declare_meta else ''
+    paragraphs = []
+    while sum(len(p) for p in paragraphs) < size_kb * 1024:
+        paragraphs.append(f"<p>{PARAGRAPH * 5}</p>")
+    html = f"<html><head>{meta}<title>Článek</title></head><body><article>{''.join(paragraphs)}</article></body></html>"
+    return html.encode(encoding)
+
+
+def make_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict({})
+    response._content = body
+    return response
+
+
+def time_per_page(func, bodies):
+    start = time.perf_counter()
+    for i, body in enumerate(bodies):
+        func(i, body)
+    return (time.perf_counter() - start) / len(bodies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=50, help="pages per scenario")
+    parser.add_argument('--size', type=int, default=200, help="page size in KB")
+    args = parser.parse_args()
+
+    scenarios = [
+        ('utf-8, no declaration', 'utf-8', False),
+        ('utf-8, <meta charset>', 'utf-8', True),
+        ('windows-1250, <meta charset>', 'windows-1250', True),
+    ]
+    print(f"{'page':<30} {'text ms':>9} {'resolve ms':>11} {'text+bs4 ms':>12} {'resolve+bs4 ms':>15}")
+    for name, encoding, declare_meta in scenarios:
+        bodies = [make_page(args.size, encoding, declare_meta) for _ in range(args.pages)]
+        resolver = EncodingResolver()
+
+        def requests_decode(i, body):
+            return make_response(body).text
+
+        def resolver_decode(i, body):
+            enc = resolver.resolve(f"https://example.cz/{i}", {}, body)
+            return body.decode(enc)
+
+        def requests_parse(i, body):
+            return BeautifulSoup(make_response(body).text, 'html.parser')
+
+        def resolver_parse(i, body):
+            # Same as CrawlerProducer.parse_response: decode with the resolved charset, then parse the text
+            enc = resolver.resolve(f"https://example.cz/{i}", {}, body)
+            return BeautifulSoup(body.decode(enc, errors='replace').lstrip('\ufeff'), 'html.parser')
+
+        print(f"{name:<30} {time_per_page(requests_decode, bodies):>9.2f} "
+              f"{time_per_page(resolver_decode, bodies):>11.2f} "
+              f"{time_per_page(requests_parse, bodies):>12.2f} "
+              f"{time_per_page(resolver_parse, bodies):>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Memory and lookup throughput of SeenUrlSet against a plain ``set`` of URLs.
+
+Run from the repository root:
+    python -m benchmarks.bench_seen_set --count 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from producer_consumer.seen_set import SeenUrlSet
+
+
+def generate_urls(count, offset=0):
+    sites = ('www.novinky.cz/clanek', 'www.idnes.cz/zpravy/domaci', 'www.ctk.cz/clanek')
+    for i in range(offset, offset + count):
+        yield f"https://{sites[i % 3]}/zprava-o-udalosti-cislo-{i}-{i * 7919 % 100003}"
+
+
+def measure_memory(build, count):
+    gc.collect()
+    tracemalloc.start()
+    container = build(generate_urls(count))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, current
+
+
+def build_set(urls):
+    return set(urls)
+
+
+def build_seen_set(urls, bloom_capacity=None):
+    seen = SeenUrlSet(bloom_capacity=bloom_capacity)
+    for url in urls:
+        seen.add(url)
+    return seen
+
+
+def measure_lookups(container, count, lookups):
+    hits = list(generate_urls(lookups // 2))
+    misses = list(generate_urls(lookups - len(hits), offset=count))
+    start = time.perf_counter()
+    for url in hits:
+        url in container
+    for url in misses:
+        url in container
+    return lookups / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1_000_000, help="URLs inserted")
+    parser.add_argument('--lookups', type=int, default=200_000, help="lookups timed, half hits and half misses")
+    args = parser.parse_args()
+
+    candidates = [
+        ('set', build_set),
+        ('SeenUrlSet', build_seen_set),
+        ('SeenUrlSet+bloom', lambda urls: build_seen_set(urls, bloom_capacity=args.count)),
+    ]
+    print(f"{'container':<18} {'MB':>8} {'bytes/URL':>10} {'MB per 1M':>10} {'lookups/s':>12}")
+    for name, build in candidates:
+        container, used = measure_memory(build, args.count)
+        rate = measure_lookups(container, args.count, args.lookups)
+        print(f"{name:<18} {used / 2**20:>8.1f} {used / args.count:>10.1f} "
+              f"{used / args.count * 1_000_000 / 2**20:>10.1f} {rate:>12,.0f}")
+        del container
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,204 @@
+import time
+STARTED = time.perf_counter()
+
 import argparse
 import logging
 import sys
 from producer_consumer.config import Config
-from producer_consumer.app import CrawlerApp
 
 
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Producer-Consumer news crawler")
+    parser.add_argument("--config", default="config/config.yaml", help="path to the YAML configuration file")
+    subparsers = parser.add_subparsers(dest="command")
+
+    crawl_parser = subparsers.add_parser("crawl", help="run the crawler (default)")
+    crawl_parser.add_argument("--max-articles", type=int, help="stop after this many articles (batch mode)")
+    crawl_parser.add_argument("--max-pages", type=int, help="stop after this many fetched pages (batch mode)")
+    crawl_parser.add_argument("--time-budget", type=float, help="stop after this many seconds (batch mode)")
+    crawl_parser.add_argument("--sink", action="append", default=[],
+                              help="stdout, jsonl:<path> or socket:<path>; replaces articles.json, repeatable")
+
+    search_parser = subparsers.add_parser("search", help="query the full-text article index")
+    search_parser.add_argument("term", nargs="?", help="words to search for in title and content")
+    search_parser.add_argument("--index", help="index database, defaults to consumer.index_file from the config")
+    search_parser.add_argument("--source", help="restrict results to one source_website")
+    search_parser.add_argument("--from", dest="created_from", help="earliest created_at (ISO format)")
+    search_parser.add_argument("--to", dest="created_to", help="latest created_at (ISO format)")
+    search_parser.add_argument("--limit", type=int, default=20, help="maximum number of results")
+
+    replay_parser = subparsers.add_parser("replay", help="re-extract articles from recorded WARC archives")
+    replay_parser.add_argument("archives", nargs="+", help="WARC files or directories containing them")
+    replay_parser.add_argument("--workers", type=int, help="parser processes, defaults to the CPU count")
+    replay_parser.add_argument("--records-per-task", type=int, default=100,
+                               help="records parsed per worker task, so large archives are split between workers")
+    replay_parser.add_argument("--output-dir", help="store articles in this directory instead of consumer.output_dir; "
+                                                    "the search index is only updated when this is not set")
+
+    export_parser = subparsers.add_parser("export", help="append new articles to a columnar export")
+    export_parser.add_argument("--source", help="articles.json or a .jsonl sink file, "
+                                                "defaults to articles.json in consumer.output_dir")
+    export_parser.add_argument("--out", help="export directory, defaults to export/ in consumer.output_dir")
+    export_parser.add_argument("--format", choices=["auto", "parquet", "numpy"], default="auto",
+                               help="parquet needs pyarrow, numpy needs numpy; auto prefers parquet")
 
+    return parser.parse_args(argv)
+
+
+def crawl(args):
+    from producer_consumer.app import CrawlerApp
+    from producer_consumer.sinks import create_sink
 
     # Load configuration
     try:
-        config = Config("config/config.yaml")
+        config = Config(args.config)
     except Exception as e:
         logging.error(f"Error during execution: {e}")
+        return 1
 
 
+    try:
+        sinks = [create_sink(spec) for spec in getattr(args, "sink", [])]
+    except (ValueError, OSError) as e:
+        logging.error(f"Error during execution: {e}")
+        return 1
+
     # Create and run the crawler application
-    app = CrawlerApp(config)
+    app = CrawlerApp(config, sinks=sinks)
+    app.install_signal_handlers()
+    logging.info(f"Startup took {time.perf_counter() - STARTED:.3f}s")
 
     try:
-        app.run()
+        summary = app.run(
+            max_articles=getattr(args, "max_articles", None),
+            max_pages=getattr(args, "max_pages", None),
+            time_budget=getattr(args, "time_budget", None)
+        )
     except Exception as e:
         logging.error(f"Error during execution: {e}")
         app.stop()
+        return 1
+
+    # stderr, so the summary never mixes with articles from a stdout sink
+    print(f"{summary['pages']} pages, {summary['articles']} articles in {summary['seconds']:.1f}s "
+          f"({summary['pages_per_second']:.2f} pages/s, {summary['articles_per_second']:.2f} articles/s)",
+          file=sys.stderr)
+    return 0
+
+
+def search(args):
+    from producer_consumer.search_index import ArticleIndex
+
+    index_file = args.index
+    if not index_file:
+        try:
+            index_file = Config(args.config).search_index_file
+        except Exception as e:
+            logging.error(f"Error during execution: {e}")
+            return 1
+    if not index_file:
+        logging.error("No search index configured, set consumer.index_file or pass --index")
+        return 1
+
+    index = ArticleIndex(index_file)
+    try:
+        results = index.search(
+            term=args.term,
+            source_website=args.source,
+            created_from=args.created_from,
+            created_to=args.created_to,
+            limit=args.limit
+        )
+    except ValueError as e:
+        logging.error(f"Error during execution: {e}")
+        return 1
+    finally:
+        index.close()
+
+    for article in results:
+        print(f"{article['created_at']}  {article['source_website']}  {article['title']}")
+        print(f"    {article['url']}")
+    return 0
+
+
+def replay(args):
+    from queue import Queue
+    from producer_consumer.crawler_consumer import ArticleConsumer
+    from producer_consumer.replay import replay_archives
+    from producer_consumer.search_index import ArticleIndex
+    from producer_consumer.utils import setup_logging
+
+    try:
+        config = Config(args.config)
+    except Exception as e:
+        logging.error(f"Error during execution: {e}")
+        return 1
+    setup_logging(config.logging_level, config.logging_file)
+
+    # Replayed URLs replace their stored articles and index entries
+    search_index = None
+    if config.search_index_file and not args.output_dir:
+        search_index = ArticleIndex(config.search_index_file)
+    consumer = ArticleConsumer(
+        name="Replay",
+        queue=Queue(),
+        consume_interval=0,
+        output_dir=args.output_dir or config.output_dir,
+        search_index=search_index,
+        save_every=0
+    )
+    try:
+        stats = replay_archives(args.archives, consumer, workers=args.workers,
+                                records_per_task=args.records_per_task)
+    finally:
+        if search_index is not None:
+            search_index.close()
+
+    print(f"{stats['pages']} pages, {stats['extracted']} articles extracted, {stats['articles']} stored "
+          f"from {stats['archives']} archives in {stats['seconds']:.2f}s")
+    return 0
+
+
+def export(args):
+    import os
+    from producer_consumer.export import export_articles
+
+    source, out_dir = args.source, args.out
+    if not source or not out_dir:
+        try:
+            config = Config(args.config)
+        except Exception as e:
+            logging.error(f"Error during execution: {e}")
+            return 1
+        source = source or os.path.join(config.output_dir, "articles.json")
+        out_dir = out_dir or os.path.join(config.output_dir, "export")
+
+    try:
+        stats = export_articles(source, out_dir, fmt=args.format)
+    except (OSError, ValueError, RuntimeError) as e:
+        logging.error(f"Error during execution: {e}")
+        return 1
+
+    print(f"{stats['new_rows']} new articles exported, {stats['rows']} in total ({stats['format']}, {out_dir})")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "search":
+        return search(args)
+    if args.command == "replay":
+        return replay(args)
+    if args.command == "export":
+        return export(args)
+    return crawl(args)
 
 
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt as e:
-        logging.info(f"interuped by keyboard: {e}")
\ No newline at end of file
+        logging.info(f"interuped by keyboard: {e}")
@@ -1,58 +1,212 @@
 import logging
+import os
+import threading
 import time
 from queue import Queue
 from typing import List
 from .config import Config
 from .crawler_producer import CrawlerProducer
-from .crawler_consumer import ArticleConsumer
+from .crawler_consumer import ArticleConsumer, ArticleStore, SinkConsumer
+from .encoding import EncodingResolver
+from .host_health import HostHealth
+from .profiling import SamplingProfiler, StageReporter, StageTimer, install_signal_handlers, toggle_sampling
+from .seen_set import SeenUrlSet
 from .utils import setup_logging
 
 
 class CrawlerApp:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, sinks: list = None):
         self.config = config
         self.queue = Queue(maxsize=self.config.queue_max_size)
         self.producers: List[CrawlerProducer] = []
-        self.consumers: List[ArticleConsumer] = []
+        self.consumers: List[threading.Thread] = []
+        # Sink objects passed in by library users, on top of consumer.sinks from the config
+        self.sinks = list(sinks or [])
+        self.search_index = None
+        self.store = None
+        self.discovery = None
+        self.visited_urls = None
+        self.recorder = None
+        self.host_health = None
+        self.recrawl = None
+        self.encodings = EncodingResolver()
+        # Stage timings are always collected; reports and sampling are opt-in
+        self.timer = StageTimer()
+        self.profiler = None
+        self.reporter = None
+        self._stopped = False
+        self._stop_requested = threading.Event()
         self._setup()
 
     def _setup(self):
         setup_logging(self.config.logging_level, self.config.logging_file)
         logging.info("Application setup started.")
         try:
+            # One discovery source shared by all producers so each feed URL is crawled once
+            if self.config.feed_urls:
+                # Optional subsystems are only imported when the config enables them
+                from .feed_discovery import FeedDiscovery
+                self.discovery = FeedDiscovery(self.config.feed_urls, self.config.feed_poll_interval)
+
+            # Visited URLs are shared so producers never crawl the same page twice
+            self.visited_urls = self._load_visited_urls()
+
+            # Record raw responses for refetch-free replay
+            if self.config.warc_dir:
+                from .warc import WarcWriter
+                self.recorder = WarcWriter(self.config.warc_dir, max_file_size=self.config.warc_max_file_size)
+
+            # Stored articles are revisited on a schedule instead of never (or all at once after a restart)
+            if self.config.recrawl_file:
+                from .recrawl import RecrawlSchedule
+                self.recrawl = RecrawlSchedule(
+                    self.config.recrawl_file,
+                    min_interval=self.config.recrawl_min_interval,
+                    max_interval=self.config.recrawl_max_interval,
+                    decay=self.config.recrawl_decay,
+                    max_age=self.config.recrawl_max_age
+                )
+
+            # Started at startup or by SIGUSR1 once the CLI installs the signal handlers
+            self.profiler = SamplingProfiler(self.config.profiling_sample_interval)
+
+            # Shared so a failing host is backed off by every producer at once
+            self.host_health = HostHealth(
+                failure_threshold=self.config.host_failure_threshold,
+                cooldown=self.config.host_cooldown,
+                max_timeout=self.config.request_timeout
+            )
+
             # Initialize producers with start URLs
             for i in range(self.config.producer_count):
                 if self.config.producer_count < 1:
                     logging.error("not enough producerers")
                     self.stop()
                 else:
+                    name = f"Producer-{i + 1}"
+                    spill_path = None
+                    if self.config.frontier_dir:
+                        spill_path = os.path.join(self.config.frontier_dir, f"{name}.db")
                     producer = CrawlerProducer(
-                        name=f"Producer-{i + 1}",
+                        name=name,
                         queue=self.queue,
                         produce_interval=self.config.produce_interval,
-                        start_urls=self.config.start_urls
+                        start_urls=self.config.start_urls,
+                        discovery=self.discovery,
+                        max_depth=self.config.max_depth,
+                        max_frontier_size=self.config.max_frontier_size,
+                        frontier_spill_path=spill_path,
+                        frontier_memory_size=self.config.frontier_memory_size,
+                        visited_urls=self.visited_urls,
+                        recorder=self.recorder,
+                        host_health=self.host_health,
+                        encodings=self.encodings,
+                        timer=self.timer,
+                        recrawl=self.recrawl
                     )
                 self.producers.append(producer)
                 logging.debug(f"Initialized {producer.name}")
 
-            # Initialize consumers with output directory
-            for i in range(self.config.consumer_count):
-                consumer = ArticleConsumer(
-                    name=f"Consumer-{i + 1}",
-                    queue=self.queue,
-                    consume_interval=self.config.consume_interval,
-                    output_dir=self.config.output_dir
-                )
-                
-                self.consumers.append(consumer)
-                logging.debug(f"Initialized {consumer.name}")
+            if self.config.search_index_file:
+                from .search_index import ArticleIndex
+                self.search_index = ArticleIndex(self.config.search_index_file)
+                logging.debug(f"Search index opened at {self.config.search_index_file}")
+
+            if self.config.sinks:
+                from .sinks import create_sink
+                self.sinks.extend(create_sink(spec) for spec in self.config.sinks)
+            if self.sinks:
+                self._setup_sink_consumers()
+            else:
+                self._setup_article_consumers()
+                self._backfill_index()
+                self._seed_recrawl()
 
             logging.info("Application setup completed.")
         except Exception:
             logging.exception("Application setup failed.")
 
+    def _setup_article_consumers(self):
+        # One store for all consumers, so revisions of an article reach its stored version
+        self.store = ArticleStore(self.config.output_dir)
+        for i in range(self.config.consumer_count):
+            consumer = ArticleConsumer(
+                name=f"Consumer-{i + 1}",
+                queue=self.queue,
+                consume_interval=self.config.consume_interval,
+                output_dir=self.config.output_dir,
+                search_index=self.search_index,
+                timer=self.timer,
+                store=self.store
+            )
+
+            self.consumers.append(consumer)
+            logging.debug(f"Initialized {consumer.name}")
+
+    def _backfill_index(self):
+        # Articles stored before the index was enabled are added once; known URLs are skipped
+        if self.search_index is None or self.store is None or not self.store.articles:
+            return
+        try:
+            added = self.search_index.add_articles(self.store.articles)
+        except Exception as e:
+            logging.error(f"Failed to index stored articles: {e}")
+            return
+        if added:
+            logging.info(f"Indexed {added} previously stored articles")
+
+    def _seed_recrawl(self):
+        # A schedule opened next to an existing store starts from the stored articles
+        if self.recrawl is None or len(self.recrawl) or self.store is None or not self.producers:
+            return
+        is_article = self.producers[0].is_valid_article_url
+        self.recrawl.seed(a for a in self.store.articles if is_article(a['url']))
+
+    def _setup_sink_consumers(self):
+        # Sinks replace the articles.json consumers; the index becomes one more sink
+        sinks = list(self.sinks)
+        if self.search_index is not None:
+            from .sinks import IndexSink
+            sinks.append(IndexSink(self.search_index))
+        for i in range(self.config.consumer_count):
+            consumer = SinkConsumer(
+                name=f"Consumer-{i + 1}",
+                queue=self.queue,
+                sinks=sinks,
+                batch_size=self.config.consumer_batch_size,
+                timer=self.timer
+            )
+            self.consumers.append(consumer)
+            logging.debug(f"Initialized {consumer.name} with {len(sinks)} sinks")
+
+    def _load_visited_urls(self):
+        visited_file = self.config.visited_file
+        if visited_file and os.path.exists(visited_file):
+            try:
+                return SeenUrlSet.load(visited_file)
+            except (OSError, ValueError) as e:
+                logging.error(f"Failed to load visited URLs from {visited_file}: {e}")
+        return SeenUrlSet(bloom_capacity=self.config.visited_bloom_capacity)
+
+    def install_signal_handlers(self):
+        """
+        Let SIGUSR1 toggle sampling of all threads and SIGUSR2 log the stage timings.
+
+        Signal handlers are process-wide, so only the CLI installs them; library
+        users embedding the app keep their own.
+
+        Returns:
+            bool: False where the signals are unavailable or outside the main thread.
+        """
+        return install_signal_handlers(self.profiler, self.timer, self.config.profiling_dir)
+
     def start(self):
         logging.info("Starting producers and consumers.")
+        if self.config.profiling_sample and self.profiler is not None:
+            self.profiler.start()
+        if self.config.profiling_report_interval:
+            self.reporter = StageReporter(self.timer, self.config.profiling_report_interval)
+            self.reporter.start()
         for producer in self.producers:
             producer.start()
 
@@ -61,25 +215,104 @@ class CrawlerApp:
 
 
     def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
         logging.info("Stopping producers and consumers.")
         for producer in self.producers:
             producer.stop()
+        for producer in self.producers:
+            if producer.ident is not None:
+                producer.join()
+        # Consumers finish whatever is still queued before they exit
         for consumer in self.consumers:
             consumer.stop()
-        for producer in self.producers:
-            producer.join()
         for consumer in self.consumers:
-            consumer.join()
+            if consumer.ident is not None:
+                consumer.join()
+        for sink in self.sinks:
+            sink.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.recrawl is not None:
+            self.recrawl.close()
+        if self.reporter is not None:
+            self.reporter.stop()
+            logging.info(self.timer.report())
+        if self.profiler is not None and self.profiler.running:
+            toggle_sampling(self.profiler, self.config.profiling_dir)
+        if self.visited_urls is not None and self.config.visited_file:
+            try:
+                self.visited_urls.save(self.config.visited_file)
+            except OSError as e:
+                logging.error(f"Failed to save visited URLs to {self.config.visited_file}: {e}")
         logging.info("All producers and consumers have been stopped.")
 
-    def run(self):
+    def request_stop(self):
+        """Ask a running ``run`` call, e.g. in another thread, to shut down."""
+        self._stop_requested.set()
+
+    def _stop_reason(self, started: float, max_articles: int = None, max_pages: int = None,
+                     time_budget: float = None):
+        if self._stop_requested.is_set():
+            return "stop requested"
+        if max_articles is not None and sum(p.articles_produced for p in self.producers) >= max_articles:
+            return f"reached {max_articles} articles"
+        if max_pages is not None and sum(p.pages_crawled for p in self.producers) >= max_pages:
+            return f"reached {max_pages} pages"
+        if time_budget is not None and time.monotonic() - started >= time_budget:
+            return f"used the {time_budget}s time budget"
+        return None
+
+    def summary(self, elapsed: float):
+        pages = sum(p.pages_crawled for p in self.producers)
+        articles = sum(c.articles_saved for c in self.consumers)
+        return {
+            'pages': pages,
+            'articles': articles,
+            'seconds': elapsed,
+            'pages_per_second': pages / elapsed if elapsed else 0.0,
+            'articles_per_second': articles / elapsed if elapsed else 0.0
+        }
+
+    def run(self, max_articles: int = None, max_pages: int = None, time_budget: float = None):
+        """
+        Run until Ctrl+C, or in batch mode until one of the stop conditions is met.
+
+        Args:
+            max_articles (int): Stop once producers have queued this many articles
+            max_pages (int): Stop once producers have fetched this many pages
+            time_budget (float): Stop after this many seconds of wall-clock time
+
+        Returns:
+            dict: Throughput summary, see ``summary``
+        """
+        started = time.monotonic()
+        bounded = any(limit is not None for limit in (max_articles, max_pages, time_budget))
         try:
             self.start()
 
-            logging.info("Application running indefinitely. Press Ctrl+C to stop.")
+            if bounded:
+                logging.info("Application running in batch mode.")
+            else:
+                logging.info("Application running indefinitely. Press Ctrl+C to stop.")
             while True:
-                time.sleep(1)
+                reason = self._stop_reason(started, max_articles, max_pages, time_budget)
+                if reason:
+                    logging.info(f"Stopping: {reason}.")
+                    break
+                self._stop_requested.wait(0.1 if bounded else 1)
         except KeyboardInterrupt:
             logging.info("KeyboardInterrupt received. Shutting down.")
         finally:
-            self.stop()
\ No newline at end of file
+            self.stop()
+
+        result = self.summary(time.monotonic() - started)
+        logging.info(
+            f"Crawled {result['pages']} pages and saved {result['articles']} articles in "
+            f"{result['seconds']:.1f}s ({result['pages_per_second']:.2f} pages/s, "
+            f"{result['articles_per_second']:.2f} articles/s)"
+        )
+        return result
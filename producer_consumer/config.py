@@ -26,6 +26,78 @@ class Config:
     def start_urls(self):
         return self._config['producer']['start_urls']
 
+    @property
+    def max_depth(self):
+        return self._config['producer'].get('max_depth')
+
+    @property
+    def max_frontier_size(self):
+        return self._config['producer'].get('max_frontier_size')
+
+    @property
+    def frontier_dir(self):
+        return self._config['producer'].get('frontier_dir')
+
+    @property
+    def frontier_memory_size(self):
+        return self._config['producer'].get('frontier_memory_size', 1000)
+
+    @property
+    def visited_file(self):
+        return self._config['producer'].get('visited_file')
+
+    @property
+    def visited_bloom_capacity(self):
+        return self._config['producer'].get('visited_bloom_capacity')
+
+    @property
+    def warc_dir(self):
+        return self._config['producer'].get('warc_dir')
+
+    @property
+    def warc_max_file_size(self):
+        return self._config['producer'].get('warc_max_file_size', 100 * 1024 * 1024)
+
+    @property
+    def request_timeout(self):
+        return self._config['producer'].get('request_timeout', 10)
+
+    @property
+    def host_failure_threshold(self):
+        return self._config['producer'].get('host_failure_threshold', 3)
+
+    @property
+    def host_cooldown(self):
+        return self._config['producer'].get('host_cooldown', 30)
+
+    @property
+    def recrawl_file(self):
+        return self._config['producer'].get('recrawl_file')
+
+    @property
+    def recrawl_min_interval(self):
+        return self._config['producer'].get('recrawl_min_interval', 3600)
+
+    @property
+    def recrawl_max_interval(self):
+        return self._config['producer'].get('recrawl_max_interval', 7 * 86400)
+
+    @property
+    def recrawl_decay(self):
+        return self._config['producer'].get('recrawl_decay', 0.5)
+
+    @property
+    def recrawl_max_age(self):
+        return self._config['producer'].get('recrawl_max_age', 30 * 86400)
+
+    @property
+    def feed_urls(self):
+        return self._config['producer'].get('feed_urls') or []
+
+    @property
+    def feed_poll_interval(self):
+        return self._config['producer'].get('feed_poll_interval', 300)
+
     @property
     def consumer_count(self):
         return self._config['consumer']['count']
@@ -38,6 +110,38 @@ class Config:
     def output_dir(self):
         return self._config['consumer']['output_dir']
 
+    @property
+    def search_index_file(self):
+        return self._config['consumer'].get('index_file')
+
+    @property
+    def sinks(self):
+        return self._config['consumer'].get('sinks') or []
+
+    @property
+    def consumer_batch_size(self):
+        return self._config['consumer'].get('batch_size', 50)
+
+    @property
+    def _profiling(self):
+        return self._config.get('profiling') or {}
+
+    @property
+    def profiling_report_interval(self):
+        return self._profiling.get('report_interval')
+
+    @property
+    def profiling_sample(self):
+        return self._profiling.get('sample', False)
+
+    @property
+    def profiling_sample_interval(self):
+        return self._profiling.get('sample_interval', 0.005)
+
+    @property
+    def profiling_dir(self):
+        return self._profiling.get('dir', 'profiles')
+
     @property
     def queue_max_size(self):
         return self._config['queue']['max_size']
@@ -1,24 +1,32 @@
 import threading
-import time
 import logging
 import json
-from queue import Queue
+from queue import Queue, Empty
 import os
+from datetime import datetime
+from .profiling import StageTimer
+from .versions import make_delta
 
 
-class ArticleConsumer(threading.Thread):
-    def __init__(self, name: str, queue: Queue, consume_interval: float, output_dir: str = 'articles'):
-        super().__init__(name=name)
-        self.queue = queue
-        self.consume_interval = consume_interval
-        self._stop_event = threading.Event()
-        self.output_dir = output_dir
-        self.articles = []
-        self.setup_output_dir()
+class ArticleStore:
+    """
+    The articles in ``articles.json`` and their positions by URL, shared by all
+    ``ArticleConsumer`` threads of an app.
 
-    def setup_output_dir(self):
+    Consumers take articles off one queue, so a changed revision may reach another
+    consumer than the one that stored the article. With one store every consumer
+    finds the stored version, and only one list is ever written to ``articles.json``.
+    """
+
+    def __init__(self, output_dir: str = 'articles'):
+        self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
         self.articles_file = os.path.join(self.output_dir, 'articles.json')
+        # Earlier versions of updated articles, as deltas against the version that replaced them
+        self.versions_file = os.path.join(self.output_dir, 'versions.jsonl')
+        # Held by a consumer while it changes or writes the articles; saves happen inside updates
+        self.lock = threading.RLock()
+        self.articles = []
 
         # Load existing articles if file exists
         if os.path.exists(self.articles_file):
@@ -27,40 +35,229 @@ class ArticleConsumer(threading.Thread):
                     self.articles = json.load(f)
             except json.JSONDecodeError:
                 self.articles = []
+        self.reset(self.articles)
+
+    def reset(self, articles):
+        self.articles = articles
+        # URL -> position in self.articles, for duplicate checks and in-place updates
+        self.positions = {article['url']: i for i, article in enumerate(articles)}
+
+
+class ArticleConsumer(threading.Thread):
+    def __init__(self, name: str, queue: Queue, consume_interval: float, output_dir: str = 'articles',
+                 search_index=None, save_every: int = 10, timer=None, store=None):
+        super().__init__(name=name)
+        self.queue = queue
+        self.consume_interval = consume_interval
+        self._stop_event = threading.Event()
+        self.search_index = search_index
+        self.save_every = save_every
+        self.timer = timer if timer is not None else StageTimer()
+        self.articles_saved = 0
+        self.articles_updated = 0
+        self.articles_replaced = 0
+        # Usually one ArticleStore shared by all consumers of the app
+        self.store = store if store is not None else ArticleStore(output_dir)
+        self.output_dir = self.store.output_dir
+        self.articles_file = self.store.articles_file
+        self.versions_file = self.store.versions_file
+
+    @property
+    def articles(self):
+        return self.store.articles
+
+    @articles.setter
+    def articles(self, articles):
+        self.store.reset(articles)
+
+    @property
+    def positions(self):
+        return self.store.positions
 
     def save_article(self, article_data):
-        # Check for duplicates based on URL
-        if not any(article['url'] == article_data['url'] for article in self.articles):
-            self.articles.append(article_data)
-            logging.info(f"{self.name} saved article")
+        """
+        Store a new article, or a changed revision of a stored one.
 
-            # Save to file every 10 articles
-            if len(self.articles) % 10 == 0:
-                self.save_to_file()
+        Returns:
+            bool: False if nothing was stored because the URL is already known.
+        """
+        # The store is shared, so a revision finds the article whichever consumer stored it
+        with self.store.lock:
+            # Check for duplicates based on URL
+            with self.timer.stage('dedup'):
+                is_new = article_data['url'] not in self.positions
+            if is_new:
+                self.positions[article_data['url']] = len(self.articles)
+                self.articles.append(article_data)
+                self.articles_saved += 1
+                logging.info(f"{self.name} saved article")
 
-    def save_to_file(self):
+                # Keep the full-text index in step with the stored articles
+                if self.search_index is not None:
+                    try:
+                        with self.timer.stage('index'):
+                            self.search_index.add_article(article_data)
+                    except Exception as e:
+                        logging.error(f"{self.name} failed to index article: {e}")
+
+                # Save to file every save_every articles (10 by default)
+                if self.save_every and len(self.articles) % self.save_every == 0:
+                    self.save_to_file()
+                return True
+            if article_data.get('revision'):
+                return self.update_article(article_data)
+            return False
+
+    def _reindex(self, article_data):
+        if self.search_index is None:
+            return
         try:
-            with open(self.articles_file, 'w', encoding='utf-8') as f:
-                json.dump(self.articles, f, ensure_ascii=False, indent=2)
-            logging.info(f"{self.name} saved {len(self.articles)} articles to {self.articles_file}")
+            with self.timer.stage('index'):
+                self.search_index.add_articles([article_data], replace=True)
         except Exception as e:
-            logging.error(f"{self.name} failed to save articles to file: {e}")
+            logging.error(f"{self.name} failed to index article: {e}")
+
+    def update_article(self, article_data):
+        """Replace a stored article with a changed version, keeping the old one as a delta."""
+        with self.store.lock:
+            position = self.positions.get(article_data['url'])
+            if position is None:
+                return False
+            previous = self.articles[position]
+            if previous.get('revision', 0) >= article_data['revision']:
+                return False
+
+            with self.timer.stage('persist'):
+                record = {
+                    'url': previous['url'],
+                    'revision': previous.get('revision', 0),
+                    'replaced_at': datetime.now().isoformat(),
+                    'title': previous.get('title'),
+                    'created_at': previous.get('created_at'),
+                    'delta': make_delta(article_data.get('content'), previous.get('content'))
+                }
+                try:
+                    with open(self.versions_file, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                except OSError as e:
+                    logging.error(f"{self.name} failed to store the previous version of {previous['url']}: {e}")
+                    return False
+            self.articles[position] = article_data
+            self.articles_updated += 1
+            logging.info(f"{self.name} updated article to revision {article_data['revision']}")
+            self._reindex(article_data)
+
+            if self.save_every and self.articles_updated % self.save_every == 0:
+                self.save_to_file()
+            return True
+
+    def replace_article(self, article_data):
+        """
+        Overwrite the stored article of the same URL, e.g. with a re-extraction from a replayed
+        archive. The stored revision number is kept and no delta is written.
+
+        Returns:
+            bool: False if the stored article is already identical.
+        """
+        with self.store.lock:
+            position = self.positions.get(article_data['url'])
+            if position is None:
+                return self.save_article(article_data)
+            previous = self.articles[position]
+            if 'revision' in previous:
+                article_data = dict(article_data, revision=previous['revision'])
+            if article_data == previous:
+                return False
+            self.articles[position] = article_data
+            self.articles_replaced += 1
+            self._reindex(article_data)
+            return True
+
+    def save_to_file(self):
+        with self.store.lock:
+            try:
+                with self.timer.stage('persist'), open(self.articles_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.articles, f, ensure_ascii=False, indent=2)
+                logging.info(f"{self.name} saved {len(self.articles)} articles to {self.articles_file}")
+            except Exception as e:
+                logging.error(f"{self.name} failed to save articles to file: {e}")
 
     def run(self):
         logging.info(f"{self.name} started.")
-        while not self._stop_event.is_set():
+        # After stop() the queue is still drained, so no produced article is lost
+        while not (self._stop_event.is_set() and self.queue.empty()):
+            try:
+                with self.timer.stage('dequeue'):
+                    article = self.queue.get(timeout=0.5)
+            except Empty:
+                continue
             try:
-                article = self.queue.get(timeout=100)
                 self.save_article(article)
-                self.queue.task_done()
             except Exception as e:
                 logging.warning(f"{self.name} failed to process article: {e}")
-                time.sleep(1)
-            time.sleep(self.consume_interval)
+                self._stop_event.wait(1)
+            finally:
+                self.queue.task_done()
+            self._stop_event.wait(self.consume_interval)
 
         # Save remaining articles before stopping
         self.save_to_file()
         logging.info(f"{self.name} stopped.")
 
     def stop(self):
-        self._stop_event.set()
\ No newline at end of file
+        self._stop_event.set()
+
+class SinkConsumer(threading.Thread):
+    """
+    Consumer stage that takes articles off the queue in batches and hands each
+    batch to every sink (see ``sinks.py``), instead of rewriting a JSON file.
+
+    Sinks are append-only, so a changed revision from a recrawl is written as a
+    full copy carrying its ``revision`` number rather than as a delta, so a URL
+    can appear several times and its highest revision is the current one. The
+    search index replaces its entry.
+    """
+
+    def __init__(self, name: str, queue: Queue, sinks: list, batch_size: int = 50, timer=None):
+        super().__init__(name=name)
+        self.queue = queue
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.articles_saved = 0
+        self.timer = timer if timer is not None else StageTimer()
+        self._stop_event = threading.Event()
+
+    def next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def run(self):
+        logging.info(f"{self.name} started.")
+        # After stop() the queue is still drained, so no produced article is lost
+        while not (self._stop_event.is_set() and self.queue.empty()):
+            with self.timer.stage('dequeue'):
+                batch = self.next_batch()
+            if not batch:
+                continue
+            for sink in self.sinks:
+                try:
+                    with self.timer.stage('persist'):
+                        sink.write_batch(batch)
+                except Exception as e:
+                    logging.error(f"{self.name} failed to write {len(batch)} articles to {type(sink).__name__}: {e}")
+            self.articles_saved += len(batch)
+            for _ in batch:
+                self.queue.task_done()
+            logging.debug(f"{self.name} wrote a batch of {len(batch)} articles")
+        logging.info(f"{self.name} stopped.")
+
+    def stop(self):
+        self._stop_event.set()
@@ -4,19 +4,48 @@ import logging
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-from queue import Queue
+from queue import Queue, Full
 import re
+from .encoding import EncodingResolver
+from .frontier import Frontier
+from .profiling import StageTimer
+from .versions import UNCHANGED
 
 
 class CrawlerProducer(threading.Thread):
-    def __init__(self, name: str, queue: Queue, produce_interval: float, start_urls: list):
+    def __init__(self, name: str, queue: Queue, produce_interval: float, start_urls: list,
+                 discovery=None, max_depth: int = None, max_frontier_size: int = None,
+                 frontier_spill_path: str = None, frontier_memory_size: int = 1000,
+                 visited_urls=None, recorder=None, host_health=None, encodings=None,
+                 timer=None, recrawl=None):
         super().__init__(name=name)
         self.queue = queue
         self.produce_interval = produce_interval
         self.start_urls = start_urls
-        self.visited_urls = set()
+        # May be a SeenUrlSet shared by all producers
+        self.visited_urls = visited_urls if visited_urls is not None else set()
         self._stop_event = threading.Event()
-        self.url_queue = list(start_urls)
+        self.pages_crawled = 0
+        self.articles_produced = 0
+        self.url_queue = Frontier(
+            max_depth=max_depth,
+            max_size=max_frontier_size,
+            spill_path=frontier_spill_path,
+            memory_size=frontier_memory_size
+        )
+        self.seed_frontier()
+        self.discovery = discovery
+        # Optional WarcWriter recording every fetched response for replay
+        self.recorder = recorder
+        # Optional HostHealth shared by all producers; tripped hosts are deferred
+        self.host_health = host_health
+        # Resolves charsets from headers/<meta> instead of requests' detection over the whole body
+        self.encodings = encodings if encodings is not None else EncodingResolver()
+        # Per-stage wall/CPU time, usually one StageTimer shared by the whole app
+        self.timer = timer if timer is not None else StageTimer()
+        # Optional RecrawlSchedule shared by all producers; due URLs bypass visited_urls
+        self.recrawl = recrawl
+        self._recrawl_urls = set()
 
     def is_valid_article_url(self, url):
         valid_domains = ['novinky.cz', 'idnes.cz', 'ctk.cz']
@@ -41,12 +70,28 @@ class CrawlerProducer(threading.Thread):
 
         return domain_match and is_article and not is_file
 
-    def extract_article_data(self, url, soup):
+    def url_priority(self, url, depth):
+        # Article pages first, then fresh links found on seed pages, deeper links last
+        priority = 0.0
+        if self.is_valid_article_url(url):
+            priority += 2
+        if depth <= 1:
+            priority += 1
+        return priority - 0.1 * depth
+
+    def add_url(self, url, depth):
+        return self.url_queue.push(url, depth, self.url_priority(url, depth))
+
+    def seed_frontier(self):
+        for url in self.start_urls:
+            self.add_url(url, 0)
+
+    def extract_article_data(self, url, soup, fetched_at=None):
         article_data = {
             'url': url,
             'title': self.extract_title(soup),
             'content': self.extract_content(soup),
-            'created_at': self.extract_date(soup),
+            'created_at': self.extract_date(soup, fetched_at),
             'source_website': urlparse(url).netloc
         }
         return article_data
@@ -67,7 +112,8 @@ class CrawlerProducer(threading.Thread):
                 return content_elem.get_text(separator=' ', strip=True)
         return "Content not found"
 
-    def extract_date(self, soup):
+    def extract_date(self, soup, fetched_at=None):
+        # Pages without a date get fetched_at (e.g. the capture time of a replayed record) or the current time
         from datetime import datetime
         date_selectors = [
             'meta[property="article:published_time"]',
@@ -83,7 +129,7 @@ class CrawlerProducer(threading.Thread):
                     return datetime.fromisoformat(date_str.replace('Z', '+00:00')).isoformat()
                 except (ValueError, TypeError):
                     pass
-        return datetime.now().isoformat()
+        return fetched_at or datetime.now().isoformat()
 
     def extract_links(self, soup, base_url):
         links = set()
@@ -93,18 +139,58 @@ class CrawlerProducer(threading.Thread):
                 links.add(absolute_url)
         return links
 
-    def crawl_url(self, url):
+    def parse_response(self, url, response, fetched_at=None):
+        """
+        Parse a fetched (or replayed) response into its article data and article links.
+
+        ``fetched_at`` is the ``created_at`` of pages without a date of their own,
+        the current time if not given.
+        """
+        with self.timer.stage('decode'):
+            body = response.content
+            encoding = self.encodings.resolve(url, response.headers, body)
+            # Decoded here rather than by BeautifulSoup so decoding and parsing are timed apart
+            text = body.decode(encoding, errors='replace').lstrip('\ufeff')
+        with self.timer.stage('parse'):
+            soup = BeautifulSoup(text, 'html.parser')
+        with self.timer.stage('extract'):
+            return self.extract_article_data(url, soup, fetched_at), self.extract_links(soup, url)
+
+    def fetch(self, url):
+        # Without host health tracking every request gets the fixed 10 s timeout
+        if self.host_health is None:
+            return requests.get(url, timeout=10)
+
+        host = urlparse(url).netloc
+        start = time.monotonic()
+        try:
+            response = requests.get(url, timeout=self.host_health.timeout_for(host))
+        except requests.RequestException:
+            self.host_health.record_failure(host)
+            raise
+        if response.status_code >= 500:
+            self.host_health.record_failure(host)
+        else:
+            self.host_health.record_success(host, time.monotonic() - start)
+        return response
+
+    def crawl_url(self, url, depth=0):
         try:
-            response = requests.get(url, timeout=10)
+            with self.timer.stage('fetch'):
+                response = self.fetch(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            self.pages_crawled += 1
+            if self.recorder is not None:
+                self.recorder.write_response(url, response)
 
             # Extract article data
-            article_data = self.extract_article_data(url, soup)
+            article_data, new_links = self.parse_response(url, response)
 
-            # Extract new links and add them to url_queue
-            new_links = self.extract_links(soup, url)
-            self.url_queue.extend(list(new_links - self.visited_urls))
+            # Add new links to url_queue
+            with self.timer.stage('dedup'):
+                for link in new_links:
+                    if link not in self.visited_urls:
+                        self.add_url(link, depth + 1)
 
             return article_data
 
@@ -112,26 +198,106 @@ class CrawlerProducer(threading.Thread):
             logging.error(f"{self.name} failed to crawl {url}: {e}")
             return None
 
+    def discover_urls(self):
+        # Feed/sitemap URLs go to the front, the HTML link walk is the fallback
+        if self.discovery is None:
+            return
+        new_urls = [
+            url for url in self.discovery.poll()
+            if self.is_valid_article_url(url) and not self.is_known(url)
+        ]
+        for url in new_urls:
+            self.add_url(url, 1)
+        if new_urls:
+            logging.debug(f"{self.name} queued {len(new_urls)} discovered URLs")
+
+    def schedule_recrawls(self):
+        if self.recrawl is None:
+            return
+        for url in self.recrawl.due():
+            self._recrawl_urls.add(url)
+            self.add_url(url, 1)
+
+    def is_known(self, url):
+        # Recrawl candidates are crawled again; anything else already seen or scheduled is skipped
+        if url in self._recrawl_urls:
+            return False
+        return url in self.visited_urls or (self.recrawl is not None and url in self.recrawl)
+
+    def enqueue(self, article_data):
+        # Block while the queue is full so slow consumers hold the producers back
+        while not self._stop_event.is_set():
+            try:
+                self.queue.put(article_data, timeout=1)
+                return True
+            except Full:
+                logging.debug(f"{self.name} waiting for queue space")
+        return False
+
+    def produce(self, article_data):
+        """Queue a crawled article; with a recrawl schedule only new and changed versions are queued."""
+        # Listing pages such as the start URLs are crawled for their links only; they are revisited
+        # every cycle, so queueing them would hand the same page to the consumers again and again
+        if not self.is_valid_article_url(article_data['url']):
+            return False
+
+        status, revision = UNCHANGED, 0
+        if self.recrawl is not None:
+            with self.timer.stage('dedup'):
+                status, revision = self.recrawl.check(article_data)
+            if status == UNCHANGED:
+                self.recrawl.record(article_data, revision)
+                logging.debug(f"{self.name} found {article_data['url']} unchanged")
+                return False
+            if revision:
+                article_data['revision'] = revision
+
+        with self.timer.stage('enqueue'):
+            queued = self.enqueue(article_data)
+        if queued:
+            self.visited_urls.add(article_data['url'])
+            if self.recrawl is not None:
+                self.recrawl.record(article_data, revision)
+            self.articles_produced += 1
+            logging.info(f"{self.name} produced article")
+        return queued
+
     def run(self):
         logging.info(f"{self.name} started.")
         while not self._stop_event.is_set():
+            self.discover_urls()
+            self.schedule_recrawls()
+
             if not self.url_queue:
                 # If no URLs left, restart with start_urls
-                self.url_queue = list(self.start_urls)
+                self.seed_frontier()
+
+            entry = self.url_queue.pop()
+            if entry is None:
+                # Every remaining URL is deferred until its host recovers
+                self._stop_event.wait(self.produce_interval)
+                continue
+            current_url, depth = entry
 
-            current_url = self.url_queue.pop(0)
+            with self.timer.stage('dedup'):
+                seen = self.is_known(current_url)
+            if not seen:
+                host = urlparse(current_url).netloc
+                if self.host_health is not None and not self.host_health.allow(host):
+                    # Skip the tripped host without sleeping so healthy hosts keep their pace
+                    self.url_queue.defer(current_url, depth, self.url_priority(current_url, depth),
+                                         self.host_health.retry_at(host))
+                    continue
 
-            if current_url not in self.visited_urls:
-                article_data = self.crawl_url(current_url)
+                article_data = self.crawl_url(current_url, depth)
+                self._recrawl_urls.discard(current_url)
                 if article_data:
-                    try:
-                        self.queue.put(article_data, timeout=1)
-                        self.visited_urls.add(current_url)
-                        logging.info(f"{self.name} produced article")
-                    except Exception as e:
-                        logging.error(f"{self.name} failed to put article in queue: {e}")
-
-            time.sleep(self.produce_interval)
+                    self.produce(article_data)
+
+            self._stop_event.wait(self.produce_interval)
+
+        # Persist the remaining frontier when it is backed by a spill file
+        self.url_queue.close()
         logging.info(f"{self.name} stopped.")
 
     def stop(self):
@@ -0,0 +1,81 @@
+import codecs
+import re
+import threading
+from urllib.parse import urlparse
+
+
+CONTENT_TYPE_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+# Matches both <meta charset="..."> and <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_RE = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+def normalize_encoding(name):
+    """Canonical codec name for ``name``, or None if Python does not know it."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type):
+    if not content_type:
+        return None
+    match = CONTENT_TYPE_CHARSET_RE.search(content_type)
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def sniff_charset(head: bytes):
+    """Find the encoding from a byte order mark or ``<meta>`` declaration in the start of a page."""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = META_CHARSET_RE.search(head)
+    return normalize_encoding(match.group(1).decode('ascii', errors='ignore')) if match else None
+
+
+class EncodingResolver:
+    """
+    Works out a page's encoding without statistical detection over the whole body.
+
+    The charset is taken, in order, from the ``Content-Type`` header, a BOM or
+    ``<meta charset>`` in the first ``sniff_bytes`` of the body, or the last
+    declared encoding seen for the same host. Pages with no declaration at all
+    are checked for valid UTF-8 and otherwise decoded as ``fallback_encoding``
+    (windows-1250, the usual legacy encoding of Czech sites).
+    """
+
+    def __init__(self, sniff_bytes: int = 1024, fallback_encoding: str = 'windows-1250'):
+        self.sniff_bytes = sniff_bytes
+        self.fallback_encoding = fallback_encoding
+        self._host_encodings = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, url: str, headers, body: bytes):
+        """
+        Returns:
+            str: Codec name to decode ``body`` with.
+        """
+        host = urlparse(url).netloc
+        encoding = charset_from_content_type(headers.get('Content-Type')) or sniff_charset(body[:self.sniff_bytes])
+        if encoding:
+            with self._lock:
+                self._host_encodings[host] = encoding
+            return encoding
+
+        with self._lock:
+            encoding = self._host_encodings.get(host)
+        if encoding:
+            return encoding
+
+        try:
+            body.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return self.fallback_encoding
@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+from .utils import parse_timestamp
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+TEXT_COLUMNS = ('url', 'title', 'content', 'source_website')
+MANIFEST = 'manifest.json'
+NAT = -2 ** 63  # int64 value numpy reads as NaT
+
+
+def available_format():
+    """Best columnar format the installed packages support, or None."""
+    if pq is not None:
+        return 'parquet'
+    if np is not None:
+        return 'numpy'
+    return None
+
+
+def iter_store(path: str):
+    """Read articles from ``articles.json`` or a JSON Lines sink file, one dict at a time."""
+    if path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+def _epoch_seconds(value):
+    # Same reading as the search index, so naive values are local time here too
+    timestamp = parse_timestamp(value)
+    return NAT if timestamp is None else int(timestamp)
+
+
+def _load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _write_parquet_part(path, articles):
+    table = pa.table({
+        'url': pa.array([a['url'] for a in articles], pa.string()),
+        'title': pa.array([a.get('title') for a in articles], pa.string()),
+        'content': pa.array([a.get('content') for a in articles], pa.string()),
+        'source_website': pa.array([a.get('source_website') for a in articles], pa.string()),
+        'created_at': pa.array(
+            [None if (s := _epoch_seconds(a.get('created_at'))) == NAT else s for a in articles],
+            pa.timestamp('s', tz='UTC')
+        ),
+    })
+    pq.write_table(table, path)
+
+
+def _write_numpy_part(path, articles):
+    os.makedirs(path, exist_ok=True)
+    for column in TEXT_COLUMNS:
+        encoded = [(a.get(column) or '').encode('utf-8') for a in articles]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        np.save(os.path.join(path, f'{column}.offsets.npy'), offsets)
+        with open(os.path.join(path, f'{column}.bin'), 'wb') as f:
+            f.write(b''.join(encoded))
+    created_at = np.array([_epoch_seconds(a.get('created_at')) for a in articles], dtype=np.int64)
+    np.save(os.path.join(path, 'created_at.npy'), created_at.view('datetime64[s]'))
+
+
+def export_articles(source: str, out_dir: str, fmt: str = 'auto'):
+    """
+    Append articles from ``source`` that are not exported yet to a columnar export in ``out_dir``.
+
+    Every run writes one new part (a Parquet file, or a directory of ``.npy``
+    arrays plus offset-indexed UTF-8 blobs) and records it in ``manifest.json``.
+    Articles are matched by URL, so re-running only exports what is new.
+
+    Args:
+        source (str): ``articles.json`` or a ``.jsonl`` sink file
+        out_dir (str): Export directory
+        fmt (str): ``parquet``, ``numpy`` or ``auto`` (Parquet when pyarrow is installed)
+
+    Returns:
+        dict: Format, number of new rows, total rows and the new part's name (None if nothing was new)
+    """
+    manifest = _load_manifest(out_dir)
+    if manifest is not None:
+        if fmt not in ('auto', manifest['format']):
+            raise ValueError(f"{out_dir} already holds a {manifest['format']} export")
+        fmt = manifest['format']
+    elif fmt == 'auto':
+        fmt = available_format()
+    if fmt == 'parquet' and pq is None:
+        raise RuntimeError("Parquet export needs pyarrow, install it or use the numpy format")
+    if fmt == 'numpy' and np is None:
+        raise RuntimeError("NumPy export needs numpy, install it or pyarrow")
+    if fmt not in ('parquet', 'numpy'):
+        raise RuntimeError("Columnar export needs pyarrow or numpy installed")
+
+    os.makedirs(out_dir, exist_ok=True)
+    if manifest is None:
+        manifest = {'format': fmt, 'rows': 0, 'parts': []}
+        exported_urls = set()
+    else:
+        exported_urls = set(ColumnarReader(out_dir).urls())
+
+    new_articles = []
+    for article in iter_store(source):
+        if article['url'] not in exported_urls:
+            exported_urls.add(article['url'])
+            new_articles.append(article)
+
+    part = None
+    if new_articles:
+        part = f"part-{len(manifest['parts']):05d}" + ('.parquet' if fmt == 'parquet' else '')
+        part_path = os.path.join(out_dir, part)
+        if fmt == 'parquet':
+            _write_parquet_part(part_path, new_articles)
+        else:
+            _write_numpy_part(part_path, new_articles)
+        manifest['parts'].append({'name': part, 'rows': len(new_articles)})
+        manifest['rows'] += len(new_articles)
+        _write_manifest(out_dir, manifest)
+        logging.info(f"Exported {len(new_articles)} new articles to {part_path}")
+
+    return {'format': fmt, 'new_rows': len(new_articles), 'rows': manifest['rows'], 'part': part}
+
+
+class TextColumn:
+    """Memory-mapped UTF-8 strings addressed through an offsets array."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return bytes(self.blob[start:end]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class ColumnarReader:
+    """
+    Reads an export written by ``export_articles``, memory-mapping the files so
+    only the columns and rows that are touched are loaded.
+    """
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        manifest = _load_manifest(out_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No export found in {out_dir}")
+        self.format = manifest['format']
+        self.parts = [os.path.join(out_dir, part['name']) for part in manifest['parts']]
+        self.rows = manifest['rows']
+
+    def __len__(self):
+        return self.rows
+
+    def table(self):
+        """All parts as one ``pyarrow.Table`` (Parquet exports only)."""
+        return pa.concat_tables([pq.read_table(path, memory_map=True) for path in self.parts])
+
+    def _numpy_text(self, part, column):
+        offsets = np.load(os.path.join(part, f'{column}.offsets.npy'), mmap_mode='r')
+        blob_path = os.path.join(part, f'{column}.bin')
+        # np.memmap cannot map an empty file
+        blob = np.memmap(blob_path, dtype=np.uint8, mode='r') if os.path.getsize(blob_path) else b''
+        return TextColumn(offsets, blob)
+
+    def column(self, name: str):
+        """
+        One column across all parts.
+
+        Returns:
+            For Parquet a ``pyarrow.ChunkedArray``; for NumPy a ``datetime64[s]``
+            array for ``created_at`` and a list of ``TextColumn`` (one per part)
+            for text columns.
+        """
+        if self.format == 'parquet':
+            return pa.chunked_array(
+                [chunk for path in self.parts
+                 for chunk in pq.read_table(path, columns=[name], memory_map=True).column(name).chunks],
+            )
+        if name == 'created_at':
+            arrays = [np.load(os.path.join(part, 'created_at.npy'), mmap_mode='r') for part in self.parts]
+            return np.concatenate(arrays) if arrays else np.array([], dtype='datetime64[s]')
+        return [self._numpy_text(part, name) for part in self.parts]
+
+    def urls(self):
+        if self.format == 'parquet':
+            for path in self.parts:
+                yield from pq.read_table(path, columns=['url'], memory_map=True).column('url').to_pylist()
+        else:
+            for text_column in self.column('url'):
+                yield from text_column
+
+    def __iter__(self):
+        """Articles as dicts, ``created_at`` as an ISO string (None when unknown)."""
+        for part in self.parts:
+            if self.format == 'parquet':
+                for row in pq.read_table(part, memory_map=True).to_pylist():
+                    created_at = row['created_at']
+                    row['created_at'] = created_at.isoformat() if created_at is not None else None
+                    yield row
+                continue
+            columns = {name: self._numpy_text(part, name) for name in TEXT_COLUMNS}
+            created_at = np.load(os.path.join(part, 'created_at.npy'), mmap_mode='r')
+            for i in range(len(created_at)):
+                row = {name: column[i] for name, column in columns.items()}
+                timestamp = created_at[i]
+                row['created_at'] = (
+                    None if np.isnat(timestamp)
+                    else datetime.fromtimestamp(int(timestamp.astype(np.int64)), timezone.utc).isoformat()
+                )
+                yield row
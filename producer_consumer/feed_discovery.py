@@ -0,0 +1,180 @@
+import gzip
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+
+ENTRY_TAGS = {'item', 'entry', 'url'}
+DATE_TAGS = {'pubDate', 'published', 'updated', 'lastmod', 'publication_date', 'date'}
+
+
+def _local_name(tag):
+    # '{http://www.sitemaps.org/schemas/sitemap/0.9}loc' -> 'loc'
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_timestamp(value):
+    """Parse ISO 8601 (Atom, sitemaps) or RFC 822 (RSS) dates into aware UTC datetimes."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def iter_feed_entries(stream):
+    """
+    Stream entries out of an RSS, Atom, sitemap or sitemap index document.
+
+    Entries are cleared and detached from their parent as soon as they are
+    processed, so the parsed tree never holds more than the entry being read.
+
+    Yields:
+        tuple: ``(kind, url, timestamp)`` where kind is ``'article'`` for RSS items,
+        Atom entries and sitemap URLs, or ``'sitemap'`` for sitemap index entries.
+    """
+    open_elements = []
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+        open_elements.pop()
+        tag = _local_name(elem.tag)
+        if tag not in ENTRY_TAGS and tag != 'sitemap':
+            continue
+
+        url = None
+        timestamp = None
+        for child in elem.iter():
+            child_tag = _local_name(child.tag)
+            if child_tag == 'loc' and url is None:
+                url = (child.text or '').strip()
+            elif child_tag == 'link' and url is None:
+                # RSS puts the URL in the text, Atom in the href attribute
+                if child.get('rel', 'alternate') == 'alternate':
+                    url = (child.get('href') or child.text or '').strip()
+            elif child_tag in DATE_TAGS and timestamp is None:
+                timestamp = parse_timestamp(child.text)
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+        if url:
+            yield ('sitemap' if tag == 'sitemap' else 'article'), url, timestamp
+
+
+class FeedDiscovery:
+    """
+    Polls RSS feeds and (news) sitemaps for new article URLs.
+
+    A single instance is shared by all producers and only one of them performs a
+    poll at a time. Every poll hands out all article URLs of the feeds that
+    changed; producers skip the ones they already crawled, so an article whose
+    fetch failed is offered again. Unchanged feeds are answered with 304 through
+    conditional requests, and nested sitemaps not modified since the last poll
+    are not fetched again.
+    """
+
+    def __init__(self, feed_urls: list, poll_interval: float = 300, timeout: float = 10):
+        self.feed_urls = list(feed_urls)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._validators = {}   # feed URL -> conditional request headers
+        self._newest = {}       # feed URL -> newest entry timestamp seen so far
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """
+        Fetch all feeds if the poll interval has elapsed.
+
+        Returns:
+            list: Article URLs of the feeds that changed since the last poll.
+        """
+        if time.monotonic() < self._next_poll:
+            return []
+        # Another producer is already polling, it will hand out the results
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            if time.monotonic() < self._next_poll:
+                return []
+            new_urls = []
+            for feed_url in self.feed_urls:
+                new_urls.extend(self._poll_feed(feed_url))
+            self._next_poll = time.monotonic() + self.poll_interval
+            if new_urls:
+                logging.info(f"Feed discovery found {len(new_urls)} new article URLs")
+            return new_urls
+        finally:
+            self._lock.release()
+
+    def _poll_feed(self, feed_url, depth=0):
+        headers = self._validators.get(feed_url, {})
+        try:
+            response = requests.get(feed_url, headers=headers, timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            logging.error(f"Feed discovery failed to fetch {feed_url}: {e}")
+            return []
+
+        newest = self._newest.get(feed_url)
+        latest = newest
+        new_urls = []
+        nested = []
+        # Streamed responses hold their connection until closed, whatever the outcome
+        try:
+            if response.status_code == 304:
+                return []
+            response.raise_for_status()
+
+            validators = {}
+            if response.headers.get('ETag'):
+                validators['If-None-Match'] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                validators['If-Modified-Since'] = response.headers['Last-Modified']
+            self._validators[feed_url] = validators
+
+            response.raw.decode_content = True
+            stream = response.raw
+            if feed_url.endswith('.gz'):
+                stream = gzip.GzipFile(fileobj=stream)
+            seen = set()
+            for kind, url, timestamp in iter_feed_entries(stream):
+                if timestamp is not None and (latest is None or timestamp > latest):
+                    latest = timestamp
+                if kind == 'sitemap':
+                    # Nested sitemaps older than the previous poll have not changed since
+                    if timestamp is None or newest is None or timestamp >= newest:
+                        nested.append(url)
+                elif url not in seen:
+                    seen.add(url)
+                    new_urls.append(url)
+        except requests.RequestException as e:
+            logging.error(f"Feed discovery failed to fetch {feed_url}: {e}")
+            return []
+        except (ET.ParseError, OSError) as e:
+            logging.error(f"Feed discovery failed to parse {feed_url}: {e}")
+        finally:
+            response.close()
+
+        if latest is not None:
+            self._newest[feed_url] = latest
+
+        # Sitemap indexes point to further sitemaps, follow them one level deep
+        if depth < 1:
+            for sitemap_url in nested:
+                new_urls.extend(self._poll_feed(sitemap_url, depth + 1))
+        return new_urls
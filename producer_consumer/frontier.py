@@ -0,0 +1,200 @@
+import bisect
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import time
+
+
+class Frontier:
+    """
+    Priority queue of URLs waiting to be crawled.
+
+    Higher priority URLs are popped first, URLs with equal priority in the order
+    they were pushed. URLs deeper than ``max_depth`` links from a seed page are
+    rejected, and once ``max_size`` URLs are waiting the lowest priority one is
+    evicted to make room.
+
+    With ``spill_path`` set, only the ``memory_size`` best URLs are kept in memory.
+    The rest is spilled to a SQLite file and read back in batches of
+    ``refill_batch`` as the in-memory window drains, so ``max_size`` can be left
+    unset for unbounded crawls. Spilled URLs survive a restart.
+
+    URLs can be deferred until a given time, e.g. while their host is failing;
+    they are held aside and rejoin the queue once that time has passed.
+    """
+
+    def __init__(self, max_depth: int = None, max_size: int = None,
+                 spill_path: str = None, memory_size: int = 1000, refill_batch: int = None):
+        self.max_depth = max_depth
+        self.max_size = max_size
+        self.spill_path = spill_path
+        self.memory_size = memory_size if spill_path else max_size
+        self.refill_batch = refill_batch or max(1, (memory_size or 1) // 2)
+        # Kept sorted ascending by (priority, -sequence), so the next URL is at the end
+        # and the eviction/spill candidate at the start
+        self._entries = []
+        self._sequence = itertools.count()
+        self._conn = None
+        self._spill_buffer = []
+        self._disk_count = 0
+        # (priority, -sequence) of the best spilled URL, compared with the best one in memory
+        self._disk_top = None
+        self._deferred = []  # heap of (until, priority, -sequence, url, depth)
+        if spill_path:
+            self._open_spill_file()
+
+    def _open_spill_file(self):
+        spill_dir = os.path.dirname(self.spill_path)
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier ("
+                " seq INTEGER PRIMARY KEY, priority REAL, url TEXT, depth INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_frontier_order ON frontier (priority DESC, seq)"
+            )
+        count, max_seq = self._conn.execute("SELECT COUNT(*), MAX(seq) FROM frontier").fetchone()
+        self._disk_count = count
+        self._sequence = itertools.count((max_seq or 0) + 1)
+        self._refresh_disk_top()
+        if count:
+            logging.info(f"Frontier resumed {count} URLs from {self.spill_path}")
+
+    def push(self, url: str, depth: int = 0, priority: float = 0.0):
+        """
+        Add a URL to the frontier.
+
+        Returns:
+            bool: False if the URL was rejected for its depth or evicted straight away.
+        """
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        return self._insert((priority, -next(self._sequence), url, depth))
+
+    def _insert(self, entry):
+        bisect.insort(self._entries, entry)
+
+        if self.memory_size is None or len(self._entries) <= self.memory_size:
+            return True
+
+        overflow = self._entries.pop(0)
+        if self._conn is None:
+            logging.debug(f"Frontier full, evicted {overflow[2]}")
+            return overflow is not entry
+
+        self._spill_buffer.append(overflow)
+        if self._disk_top is None or overflow[:2] > self._disk_top:
+            self._disk_top = overflow[:2]
+        if len(self._spill_buffer) >= self.refill_batch:
+            self._flush()
+        return True
+
+    def defer(self, url: str, depth: int, priority: float, until: float):
+        """Hold a URL back until the ``time.monotonic()`` value ``until``."""
+        heapq.heappush(self._deferred, (until, priority, -next(self._sequence), url, depth))
+
+    def _release_deferred(self):
+        now = time.monotonic()
+        while self._deferred and self._deferred[0][0] <= now:
+            _, priority, neg_seq, url, depth = heapq.heappop(self._deferred)
+            self._insert((priority, neg_seq, url, depth))
+
+    def pop(self):
+        """
+        Remove the highest priority URL.
+
+        Returns:
+            tuple: ``(url, depth)``, or None when no URL is ready, either because the
+            frontier is empty or because all remaining URLs are deferred.
+        """
+        self._release_deferred()
+        # Read spilled URLs back once they outrank everything left in memory, older URLs
+        # of the same priority included
+        if self._disk_top is not None and (not self._entries or self._entries[-1][:2] < self._disk_top):
+            self._refill()
+        if not self._entries:
+            return None
+        _, _, url, depth = self._entries.pop()
+        return url, depth
+
+    def _flush(self):
+        if not self._spill_buffer:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO frontier (seq, priority, url, depth) VALUES (?, ?, ?, ?)",
+                [(-neg_seq, priority, url, depth) for priority, neg_seq, url, depth in self._spill_buffer]
+            )
+            self._disk_count += len(self._spill_buffer)
+            self._spill_buffer = []
+
+            excess = len(self) - self.max_size if self.max_size is not None else 0
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM frontier WHERE seq IN"
+                    " (SELECT seq FROM frontier ORDER BY priority ASC, seq DESC LIMIT ?)",
+                    (excess,)
+                )
+                self._disk_count -= excess
+                logging.debug(f"Frontier full, evicted {excess} spilled URLs")
+        self._refresh_disk_top()
+
+    def _refill(self):
+        self._flush()
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT seq, priority, url, depth FROM frontier ORDER BY priority DESC, seq LIMIT ?",
+                (self.refill_batch,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM frontier WHERE seq = ?", [(row[0],) for row in rows])
+        self._disk_count -= len(rows)
+        for seq, priority, url, depth in rows:
+            bisect.insort(self._entries, (priority, -seq, url, depth))
+
+        # Anything the batch pushed out of the window goes back to disk
+        while len(self._entries) > self.memory_size:
+            self._spill_buffer.append(self._entries.pop(0))
+        self._flush()
+        # _flush only refreshes after writing, and a drained spill file must not trigger more refills
+        self._refresh_disk_top()
+        logging.debug(f"Frontier refilled {len(rows)} URLs from disk")
+
+    def _refresh_disk_top(self):
+        if self._disk_count:
+            priority, seq = self._conn.execute(
+                "SELECT priority, seq FROM frontier ORDER BY priority DESC, seq LIMIT 1"
+            ).fetchone()
+            self._disk_top = (priority, -seq)
+        else:
+            self._disk_top = None
+
+    def close(self):
+        """Write the in-memory window to the spill file so the frontier survives a restart."""
+        if self._conn is None:
+            return
+        self._spill_buffer.extend(self._entries)
+        self._spill_buffer.extend(entry[1:] for entry in self._deferred)
+        self._entries = []
+        self._deferred = []
+        self._flush()
+        self._conn.close()
+        self._conn = None
+        self._disk_top = None
+
+    def __len__(self):
+        return len(self._entries) + len(self._spill_buffer) + self._disk_count + len(self._deferred)
+
+    def __iter__(self):
+        # URLs in the order they would be popped, deferred URLs excluded
+        memory = ((-entry[0], -entry[1], entry[2]) for entry in reversed(self._entries))
+        if self._conn is None:
+            return (url for _, _, url in memory)
+        self._flush()
+        disk = self._conn.execute("SELECT -priority, seq, url FROM frontier ORDER BY priority DESC, seq")
+        return (url for _, _, url in heapq.merge(memory, disk))
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# How long other URLs of a host wait while its half-open probe is in flight
+PROBE_RETRY_DELAY = 1.0
+
+
+class HostState:
+    def __init__(self, latency_window: int, cooldown: float):
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.latencies = deque(maxlen=latency_window)
+
+
+class HostHealth:
+    """
+    Per-host circuit breaker and adaptive request timeouts, shared by all producers.
+
+    After ``failure_threshold`` consecutive failures (timeouts, connection errors,
+    5xx responses) a host is *open* and is not contacted for ``cooldown`` seconds.
+    Then a single probe request is let through (*half-open*): success closes the
+    breaker, failure opens it again with the cooldown doubled up to ``max_cooldown``.
+
+    Timeouts follow the host's recent latency: the ``percentile`` latency times
+    ``timeout_multiplier``, clamped to ``[min_timeout, max_timeout]``.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30, max_cooldown: float = 600,
+                 min_timeout: float = 2, max_timeout: float = 10, timeout_multiplier: float = 3,
+                 percentile: float = 95, latency_window: int = 50):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.percentile = percentile
+        self.latency_window = latency_window
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.latency_window, self.cooldown)
+        return state
+
+    def allow(self, host: str):
+        """Return True if a request to ``host`` may be made now."""
+        with self._lock:
+            state = self._host(host)
+            if state.state == CLOSED:
+                return True
+            if state.state == OPEN and time.monotonic() >= state.open_until:
+                state.state = HALF_OPEN
+                logging.info(f"Circuit for {host} half-open, sending a probe request")
+                return True
+            return False
+
+    def retry_at(self, host: str):
+        """Monotonic time at which ``host`` should be asked about again."""
+        with self._lock:
+            state = self._host(host)
+            if state.state == OPEN:
+                return state.open_until
+            return time.monotonic() + PROBE_RETRY_DELAY
+
+    def state(self, host: str):
+        with self._lock:
+            return self._host(host).state
+
+    def timeout_for(self, host: str):
+        with self._lock:
+            latencies = sorted(self._host(host).latencies)
+        if len(latencies) < 5:
+            return self.max_timeout
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        timeout = latencies[index] * self.timeout_multiplier
+        return max(self.min_timeout, min(self.max_timeout, timeout))
+
+    def record_success(self, host: str, latency: float):
+        with self._lock:
+            state = self._host(host)
+            state.latencies.append(latency)
+            if state.state != CLOSED:
+                logging.info(f"Circuit for {host} closed")
+            state.state = CLOSED
+            state.failures = 0
+            state.cooldown = self.cooldown
+
+    def record_failure(self, host: str):
+        with self._lock:
+            state = self._host(host)
+            state.failures += 1
+            if state.state == HALF_OPEN:
+                state.cooldown = min(self.max_cooldown, state.cooldown * 2)
+            elif state.state == OPEN or state.failures < self.failure_threshold:
+                return
+            state.state = OPEN
+            state.open_until = time.monotonic() + state.cooldown
+            logging.warning(f"Circuit for {host} open for {state.cooldown:.0f}s after {state.failures} failures")
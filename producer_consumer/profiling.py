@@ -0,0 +1,191 @@
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock and CPU time per thread and pipeline stage.
+
+    Producers and consumers wrap each step of their loop in ``stage(name)``; the
+    CPU time is the calling thread's own (``time.thread_time``), so a stage whose
+    wall time is much larger than its CPU time is spent waiting on the network,
+    a full queue or the disk.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._totals = {}  # (thread name, stage) -> [count, wall, cpu]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(threading.current_thread().name, name,
+                     time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add(self, thread: str, stage: str, wall: float, cpu: float):
+        with self._lock:
+            totals = self._totals.setdefault((thread, stage), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: ``{thread: {stage: (count, wall seconds, cpu seconds)}}``
+        """
+        with self._lock:
+            items = [(key, tuple(totals)) for key, totals in self._totals.items()]
+        result = {}
+        for (thread, stage), totals in sorted(items):
+            result.setdefault(thread, {})[stage] = totals
+        return result
+
+    def report(self):
+        """Table of where each thread's wall and CPU time went since the timer was created."""
+        elapsed = time.perf_counter() - self.started
+        lines = [f"Stage timings over {elapsed:.1f}s:",
+                 f"  {'thread':<12} {'stage':<9} {'calls':>8} {'wall s':>9} {'wall %':>7} {'cpu s':>9}"]
+        for thread, stages in self.snapshot().items():
+            for stage, (count, wall, cpu) in sorted(stages.items(), key=lambda item: -item[1][1]):
+                share = 100 * wall / elapsed if elapsed else 0.0
+                lines.append(f"  {thread:<12} {stage:<9} {count:>8} {wall:>9.3f} {share:>6.1f}% {cpu:>9.3f}")
+        return "\n".join(lines)
+
+
+class StageReporter(threading.Thread):
+    """Logs ``StageTimer.report()`` every ``interval`` seconds until stopped."""
+
+    def __init__(self, timer: StageTimer, interval: float):
+        super().__init__(name="StageReporter", daemon=True)
+        self.timer = timer
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            logging.info(self.timer.report())
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over all threads.
+
+    A background thread reads every thread's current stack from
+    ``sys._current_frames()`` each ``interval`` seconds and counts the stacks.
+    Unlike ``cProfile``, which only sees the thread that enabled it, this covers
+    producers and consumers alike at a cost that does not depend on how much
+    Python code they run. ``dump`` writes the counts in the collapsed-stack format
+    read by flame graph tools.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        self.samples = Counter()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        logging.info("Sampling profiler started.")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        logging.info(f"Sampling profiler stopped after {sum(self.samples.values())} samples.")
+
+    def _sample_loop(self):
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own_ident:
+                    self.samples[self._collapse(names.get(ident, str(ident)), frame)] += 1
+
+    @staticmethod
+    def _collapse(thread_name, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        return ";".join(reversed(stack))
+
+    def top(self, n: int = 10):
+        """The ``n`` functions most often found running, as ``(function, samples)`` pairs."""
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+    def dump(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logging.info(f"Wrote {len(self.samples)} sampled stacks to {path}")
+
+
+def install_signal_handlers(profiler: SamplingProfiler, timer: StageTimer, profile_dir: str):
+    """
+    SIGUSR1 toggles the sampling profiler, dumping a ``.folded`` file into
+    ``profile_dir`` when it stops; SIGUSR2 logs the stage report right away.
+
+    Returns:
+        bool: False where the signals are unavailable (Windows) or when not called
+        from the main thread.
+    """
+    if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def toggle_profiler(signum, frame):
+        # Stopping joins the sampler thread, which must not happen inside the handler
+        threading.Thread(target=toggle_sampling, args=(profiler, profile_dir), daemon=True).start()
+
+    def log_report(signum, frame):
+        # The report takes the timer's lock, which the interrupted main thread may be holding
+        threading.Thread(target=lambda: logging.info(timer.report()), daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, toggle_profiler)
+    signal.signal(signal.SIGUSR2, log_report)
+    return True
+
+
+def toggle_sampling(profiler: SamplingProfiler, profile_dir: str):
+    """Start the profiler, or stop it and write its samples to a timestamped file."""
+    if not profiler.running:
+        profiler.start()
+        return None
+    profiler.stop()
+    path = os.path.join(profile_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+    profiler.dump(path)
+    return path
@@ -0,0 +1,153 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .utils import parse_timestamp
+from .versions import CHANGED, NEW, UNCHANGED, content_hash
+
+
+class RecrawlSchedule:
+    """
+    Decides when stored articles are fetched again and whether they changed.
+
+    Each known URL keeps the hash of its title and content and the time of its
+    next check. The wait between checks grows with the article's age
+    (``age * decay``, clamped to ``min_interval``..``max_interval``), so fresh
+    articles that are still being edited are revisited often and old ones rarely;
+    after ``max_age`` an article is not revisited at all. The schedule lives in
+    SQLite, so a restart carries on from where it left off instead of fetching
+    every article again.
+    """
+
+    def __init__(self, db_path: str, min_interval: float = 3600, max_interval: float = 7 * 86400,
+                 decay: float = 0.5, max_age: float = 30 * 86400, lease: float = 600):
+        self.db_path = db_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.decay = decay
+        self.max_age = max_age
+        # A due URL handed to one producer is not handed out again for this long
+        self.lease = lease
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY,"
+                " content_hash TEXT NOT NULL,"
+                " revision INTEGER NOT NULL,"
+                " created_at REAL,"
+                " last_checked REAL NOT NULL,"
+                " next_check REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_next_check ON pages (next_check)")
+
+    def next_check(self, created_at, now: float):
+        """Time of the next visit, or None once the article is older than ``max_age``."""
+        age = max(0.0, now - created_at) if created_at is not None else self.max_interval / self.decay
+        if self.max_age is not None and age > self.max_age:
+            return None
+        return now + min(self.max_interval, max(self.min_interval, age * self.decay))
+
+    def check(self, article_data):
+        """
+        Compare a fetched article with the stored hash without recording it.
+
+        Returns:
+            tuple: ``(status, revision)``, status being ``NEW``, ``CHANGED`` or
+            ``UNCHANGED`` and revision the number the article is stored under.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, revision FROM pages WHERE url = ?", (article_data['url'],)
+            ).fetchone()
+        if row is None:
+            return NEW, 0
+        stored_hash, revision = row
+        if stored_hash == content_hash(article_data):
+            return UNCHANGED, revision
+        return CHANGED, revision + 1
+
+    def record(self, article_data, revision: int, now: float = None):
+        """
+        Store the article's hash and revision and schedule its next check.
+
+        The ``created_at`` first recorded for a URL is kept, so pages without a
+        date of their own (stamped with the crawl time) still age between visits.
+        """
+        now = time.time() if now is None else now
+        created_at = parse_timestamp(article_data.get('created_at'))
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT created_at FROM pages WHERE url = ?", (article_data['url'],)
+            ).fetchone()
+            if row is not None and row[0] is not None:
+                created_at = row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (url, content_hash, revision, created_at, last_checked, next_check)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (article_data['url'], content_hash(article_data), revision, created_at,
+                 now, self.next_check(created_at, now))
+            )
+
+    def seed(self, articles, now: float = None):
+        """
+        Schedule already stored articles that the schedule does not know yet.
+
+        Used when the schedule is first opened next to an existing store, so
+        stored articles are revisited by age rather than fetched again as new.
+
+        Returns:
+            int: Number of articles added.
+        """
+        now = time.time() if now is None else now
+        rows = []
+        for article in articles:
+            created_at = parse_timestamp(article.get('created_at'))
+            rows.append((article['url'], content_hash(article), article.get('revision', 0), created_at,
+                         now, self.next_check(created_at, now)))
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pages"
+                " (url, content_hash, revision, created_at, last_checked, next_check)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            added = self._conn.total_changes - before
+        if added:
+            logging.info(f"Scheduled {added} stored articles for recrawl")
+        return added
+
+    def due(self, limit: int = 10, now: float = None):
+        """Claim up to ``limit`` URLs whose next check has come, earliest first."""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            urls = [row[0] for row in self._conn.execute(
+                "SELECT url FROM pages WHERE next_check <= ? ORDER BY next_check LIMIT ?", (now, limit)
+            )]
+            self._conn.executemany(
+                "UPDATE pages SET next_check = ? WHERE url = ?", [(now + self.lease, url) for url in urls]
+            )
+        if urls:
+            logging.debug(f"{len(urls)} articles due for recrawl")
+        return urls
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
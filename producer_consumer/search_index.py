@@ -0,0 +1,200 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from .utils import parse_timestamp
+
+DATE_ONLY_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class ArticleIndex:
+    """
+    Full-text index over crawled articles backed by SQLite FTS5.
+
+    Titles and content are tokenized with the ``unicode61`` tokenizer with
+    diacritics removed, so Czech queries match regardless of accents
+    ("clanek" finds "článek").
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " id INTEGER PRIMARY KEY,"
+                " url TEXT UNIQUE NOT NULL,"
+                " title TEXT,"
+                " content TEXT,"
+                " created_at TEXT,"
+                " source_website TEXT,"
+                " created_ts REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_source_created_ts"
+                " ON articles (source_website, created_ts)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_created_ts"
+                " ON articles (created_ts)"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                " title, content,"
+                " content='articles', content_rowid='id',"
+                " tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def add_article(self, article_data):
+        """Index a single article. Returns False if its URL is already indexed."""
+        return self.add_articles([article_data]) == 1
+
+    def add_articles(self, articles, replace: bool = False):
+        """
+        Index a batch of articles in one transaction and return how many were new.
+
+        Articles carrying a ``revision``, or all of them with ``replace``, overwrite
+        the indexed version of their URL, if any.
+        """
+        added = 0
+        with self._lock, self._conn:
+            for article in articles:
+                if (replace or article.get('revision')) and self._update(article):
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles"
+                    " (url, title, content, created_at, source_website, created_ts)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        article['url'],
+                        article.get('title'),
+                        article.get('content'),
+                        article.get('created_at'),
+                        article.get('source_website'),
+                        parse_timestamp(article.get('created_at')),
+                    )
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO articles_fts (rowid, title, content) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, article.get('title'), article.get('content'))
+                    )
+                    added += 1
+        return added
+
+    def _update(self, article):
+        row = self._conn.execute(
+            "SELECT id, title, content FROM articles WHERE url = ?", (article['url'],)
+        ).fetchone()
+        if row is None:
+            return False
+        article_id, title, content = row
+        if (title, content) == (article.get('title'), article.get('content')):
+            return True
+        # External content FTS tables need the old values to remove them from the index
+        self._conn.execute(
+            "INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', ?, ?, ?)",
+            (article_id, title, content)
+        )
+        self._conn.execute(
+            "UPDATE articles SET title = ?, content = ?, created_at = ?, created_ts = ? WHERE id = ?",
+            (article.get('title'), article.get('content'), article.get('created_at'),
+             parse_timestamp(article.get('created_at')), article_id)
+        )
+        self._conn.execute(
+            "INSERT INTO articles_fts (rowid, title, content) VALUES (?, ?, ?)",
+            (article_id, article.get('title'), article.get('content'))
+        )
+        return True
+
+    def search(self, term: str = None, source_website: str = None,
+               created_from: str = None, created_to: str = None, limit: int = 20):
+        """
+        Query the index.
+
+        Args:
+            term (str): Words that must all appear in the title or content
+            source_website (str): Exact ``source_website`` to restrict results to
+            created_from (str): Inclusive lower bound on ``created_at`` (ISO format)
+            created_to (str): Inclusive upper bound on ``created_at`` (ISO format); a date
+                without a time includes that whole day
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Matching articles as dicts, best matches first when searching by term,
+            otherwise newest first.
+
+        Raises:
+            ValueError: If a date bound is not ISO format.
+        """
+        conditions = []
+        params = []
+        match = self._match_expression(term) if term else None
+        if match:
+            sql = (
+                "SELECT a.url, a.title, a.content, a.created_at, a.source_website"
+                " FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+            )
+            conditions.append("articles_fts MATCH ?")
+            params.append(match)
+            order = "ORDER BY articles_fts.rank"
+        else:
+            sql = "SELECT a.url, a.title, a.content, a.created_at, a.source_website FROM articles a"
+            order = "ORDER BY a.created_ts DESC"
+
+        if source_website:
+            conditions.append("a.source_website = ?")
+            params.append(source_website)
+        if created_from:
+            conditions.append("a.created_ts >= ?")
+            params.append(self._bound(created_from))
+        if created_to:
+            if DATE_ONLY_RE.match(created_to):
+                conditions.append("a.created_ts < ?")
+                params.append(self._bound(created_to, days=1))
+            else:
+                conditions.append("a.created_ts <= ?")
+                params.append(self._bound(created_to))
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" {order} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        columns = ('url', 'title', 'content', 'created_at', 'source_website')
+        return [dict(zip(columns, row)) for row in rows]
+
+    @staticmethod
+    def _bound(value: str, days: int = 0):
+        timestamp = parse_timestamp(value)
+        if timestamp is None:
+            raise ValueError(f"Invalid date '{value}', expected ISO format such as 2024-12-31")
+        return (datetime.fromtimestamp(timestamp) + timedelta(days=days)).timestamp() if days else timestamp
+
+    @staticmethod
+    def _match_expression(term: str):
+        # Quote every token so user input can't be read as FTS5 query syntax
+        tokens = term.split()
+        return " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        logging.debug(f"Search index {self.db_path} closed")
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+from array import array
+
+from .utils import normalize_url
+
+
+FILE_MAGIC = b'SEENURL1'
+HEADER = struct.Struct('<8sQQQQ')  # magic, count, table size, bloom bits, bloom hashes
+
+
+def url_hash(url: str) -> int:
+    """64-bit hash of the normalized URL. Zero marks empty slots, so it is never returned."""
+    digest = hashlib.blake2b(normalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class BloomFilter:
+    """Bit array answering "definitely not seen" without touching the hash table."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, num_bits: int = None, num_hashes: int = None):
+        self.num_bits = num_bits or max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: int):
+        # Double hashing on the two 32-bit halves of the key
+        h1 = key & 0xFFFFFFFF
+        h2 = (key >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: int):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: int):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenUrlSet:
+    """
+    Memory-compact set of visited URLs, safe to share between producers.
+
+    Only a 64-bit hash of each normalized URL is stored, in an open-addressing
+    table backed by ``array('Q')``. At the maximum load factor of 1/2 that is
+    16 bytes per URL, against 100+ bytes for a ``set`` of strings. With
+    ``bloom_capacity`` set, lookups of unseen URLs are answered by a Bloom
+    filter in front of the table.
+
+    Hash collisions make two different URLs look the same with a probability
+    of about n / 2**64, which is negligible for a crawler.
+    """
+
+    def __init__(self, initial_size: int = 1 << 16, bloom_capacity: int = None, bloom_error_rate: float = 0.01):
+        size = 1 << max(3, (initial_size - 1).bit_length())
+        self._table = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+        self._lock = threading.Lock()
+        self.bloom = BloomFilter(bloom_capacity, bloom_error_rate) if bloom_capacity else None
+
+    def _slot(self, key: int):
+        # Linear probing; returns the slot holding key or the empty slot where it belongs
+        table = self._table
+        mask = self._mask
+        i = key & mask
+        while True:
+            value = table[i]
+            if value == key or value == 0:
+                return i
+            i = (i + 1) & mask
+
+    def _insert(self, key: int):
+        i = self._slot(key)
+        if self._table[i]:
+            return False
+        self._table[i] = key
+        self._count += 1
+        if self.bloom is not None:
+            self.bloom.add(key)
+        if self._count * 2 > len(self._table):
+            self._resize(len(self._table) * 2)
+        return True
+
+    def _resize(self, size: int):
+        old_table = self._table
+        self._table = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        for key in old_table:
+            if key:
+                self._table[self._slot(key)] = key
+
+    def add(self, url: str):
+        key = url_hash(url)
+        with self._lock:
+            return self._insert(key)
+
+    def __contains__(self, url: str):
+        key = url_hash(url)
+        if self.bloom is not None and key not in self.bloom:
+            return False
+        with self._lock:
+            return self._table[self._slot(key)] != 0
+
+    def __len__(self):
+        return self._count
+
+    def save(self, path: str):
+        """Write the set to disk so a restarted crawl skips URLs it already visited."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with self._lock, open(tmp_path, 'wb') as f:
+            bloom_bits = self.bloom.num_bits if self.bloom else 0
+            bloom_hashes = self.bloom.num_hashes if self.bloom else 0
+            f.write(HEADER.pack(FILE_MAGIC, self._count, len(self._table), bloom_bits, bloom_hashes))
+            self._table.tofile(f)
+            if self.bloom is not None:
+                f.write(self.bloom.bits)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved {self._count} visited URLs to {path}")
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, 'rb') as f:
+            magic, count, size, bloom_bits, bloom_hashes = HEADER.unpack(f.read(HEADER.size))
+            if magic != FILE_MAGIC:
+                raise ValueError(f"{path} is not a visited URL file")
+            seen = cls(initial_size=size)
+            seen._table = array('Q')
+            seen._table.fromfile(f, size)
+            seen._count = count
+            if bloom_bits:
+                seen.bloom = BloomFilter(count or 1, num_bits=bloom_bits, num_hashes=bloom_hashes)
+                seen.bloom.bits = bytearray(f.read(len(seen.bloom.bits)))
+        logging.info(f"Loaded {count} visited URLs from {path}")
+        return seen
@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+from queue import Queue, Empty, Full
+
+
+def _jsonl(articles):
+    return "".join(json.dumps(article, ensure_ascii=False) + "\n" for article in articles)
+
+
+class JsonlFileSink:
+    """Appends articles to a JSON Lines file; nothing already written is ever rewritten."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write_batch(self, articles):
+        with self._lock:
+            self._file.write(_jsonl(articles))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class StdoutSink:
+    """Writes articles to standard output as JSON Lines, for piping into other tools."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def write_batch(self, articles):
+        with self._lock:
+            self.stream.write(_jsonl(articles))
+            self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class UnixSocketSink:
+    """
+    Sends articles as JSON Lines to a listening Unix domain socket.
+
+    The connection is opened lazily and re-opened on the next batch after an error;
+    batches that cannot be delivered are dropped and logged.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._socket = None
+
+    def write_batch(self, articles):
+        with self._lock:
+            try:
+                if self._socket is None:
+                    self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self._socket.connect(self.path)
+                self._socket.sendall(_jsonl(articles).encode('utf-8'))
+            except OSError as e:
+                logging.error(f"Failed to send {len(articles)} articles to {self.path}: {e}")
+                self._disconnect()
+
+    def _disconnect(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+class IndexSink:
+    """Adds articles to an ``ArticleIndex`` one transaction per batch."""
+
+    def __init__(self, search_index):
+        self.search_index = search_index
+
+    def write_batch(self, articles):
+        self.search_index.add_articles(articles)
+
+    def close(self):
+        pass
+
+
+class BufferSink:
+    """
+    Bounded hand-off from the consumer stage to code iterating over articles.
+
+    When the buffer is full ``write_batch`` blocks, which blocks the consumers, fills
+    the article queue and in turn holds the producers back. Once closed, remaining
+    buffered articles can still be read and further writes are dropped.
+    """
+
+    def __init__(self, maxsize: int = 100):
+        self._queue = Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+
+    def write_batch(self, articles):
+        for article in articles:
+            while not self._closed.is_set():
+                try:
+                    self._queue.put(article, timeout=0.1)
+                    break
+                except Full:
+                    continue
+
+    def get(self):
+        """Next article, blocking until one arrives; None once the sink is closed and empty."""
+        while True:
+            try:
+                return self._queue.get(timeout=0.1)
+            except Empty:
+                if self._closed.is_set():
+                    try:
+                        return self._queue.get_nowait()
+                    except Empty:
+                        return None
+
+    def __iter__(self):
+        while True:
+            article = self.get()
+            if article is None:
+                return
+            yield article
+
+    def close(self):
+        self._closed.set()
+
+
+def create_sink(spec: str):
+    """
+    Build a sink from its configuration string.
+
+    Args:
+        spec (str): ``stdout``, ``jsonl:<path>`` or ``socket:<path>``
+    """
+    kind, _, target = spec.partition(':')
+    if kind == 'stdout':
+        return StdoutSink()
+    if kind == 'jsonl' and target:
+        return JsonlFileSink(target)
+    if kind == 'socket' and target:
+        return UnixSocketSink(target)
+    raise ValueError(f"Unknown sink '{spec}', expected stdout, jsonl:<path> or socket:<path>")
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+from .app import CrawlerApp
+from .config import Config
+from .sinks import BufferSink
+
+
+def iter_articles(config: Config, buffer_size: int = 100, sinks: list = None, **limits):
+    """
+    Run the crawler in the background and yield articles as the consumers take them off the queue.
+
+    At most ``buffer_size`` articles wait for the caller. When the caller falls
+    behind, the consumers and then the producers are held back instead of
+    articles piling up in memory. Leaving the loop early stops the crawler.
+
+    Args:
+        config (Config): Application configuration
+        buffer_size (int): Articles buffered between the consumers and the caller
+        sinks (list): Extra sinks (see ``sinks.py``) that receive every article as well
+        **limits: Batch-mode stop conditions passed to ``CrawlerApp.run``
+            (``max_articles``, ``max_pages``, ``time_budget``)
+
+    Yields:
+        dict: Article data as produced by ``CrawlerProducer``
+    """
+    buffer = BufferSink(buffer_size)
+    app = CrawlerApp(config, sinks=[buffer] + list(sinks or []))
+    runner = threading.Thread(target=app.run, kwargs=limits, name="CrawlerApp", daemon=True)
+    runner.start()
+    try:
+        yield from buffer
+    finally:
+        # Stop blocking the consumers before asking the app to drain and shut down
+        buffer.close()
+        app.request_stop()
+        runner.join()
+
+
+async def aiter_articles(config: Config, buffer_size: int = 100, sinks: list = None, **limits):
+    """Async version of ``iter_articles``; the crawler threads run outside the event loop."""
+    loop = asyncio.get_running_loop()
+    articles = iter_articles(config, buffer_size, sinks, **limits)
+    try:
+        while True:
+            article = await loop.run_in_executor(None, next, articles, None)
+            if article is None:
+                return
+            yield article
+    finally:
+        await loop.run_in_executor(None, articles.close)
@@ -1,6 +1,8 @@
 import logging
 import os
+from datetime import datetime
 from logging.handlers import RotatingFileHandler
+from urllib.parse import urlsplit, urlunsplit
 
 
 def setup_logging(level: str, log_file: str):
@@ -42,4 +44,44 @@ def setup_logging(level: str, log_file: str):
     logger.addHandler(file_handler)
 
     # Log the setup completion
-    logging.info(f"Logging setup completed. Level: {level}, File: {log_file}")
\ No newline at end of file
+    logging.info(f"Logging setup completed. Level: {level}, File: {log_file}")
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings compare equal.
+
+    Lowercases the scheme and host, drops default ports and the fragment,
+    and strips a trailing slash from the path.
+
+    Args:
+        url (str): URL to normalize
+
+    Returns:
+        str: Normalized URL
+    """
+    parsed = urlsplit(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    path = parsed.path.rstrip('/') or '/'
+    return urlunsplit((scheme, netloc, path, parsed.query, ''))
+
+
+def parse_timestamp(value):
+    """
+    Convert an ISO format date such as ``created_at`` to a Unix timestamp.
+
+    Values without a UTC offset are read as local time, which is how
+    ``CrawlerProducer.extract_date`` writes its fallback.
+
+    Args:
+        value (str): ISO format date or datetime, ``Z`` meaning UTC
+
+    Returns:
+        float: Seconds since the epoch, or None if the value is not ISO format
+    """
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
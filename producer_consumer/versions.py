@@ -0,0 +1,72 @@
+import difflib
+import hashlib
+import json
+import os
+import re
+
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+TOKEN_RE = re.compile(r'(\s+)')
+
+
+def content_hash(article_data) -> str:
+    """Hash of the parts of an article that count as a change (title and content)."""
+    text = f"{article_data.get('title') or ''}\0{article_data.get('content') or ''}"
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def make_delta(new_text: str, old_text: str):
+    """
+    Word-level delta that rebuilds ``old_text`` from ``new_text``.
+
+    Returns:
+        list: ``[start, end]`` token ranges to copy from ``new_text`` and strings to insert.
+    """
+    new_tokens = TOKEN_RE.split(new_text or '')
+    old_tokens = TOKEN_RE.split(old_text or '')
+    delta = []
+    matcher = difflib.SequenceMatcher(None, new_tokens, old_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j1 != j2:
+            delta.append(''.join(old_tokens[j1:j2]))
+    return delta
+
+
+def apply_delta(new_text: str, delta):
+    new_tokens = TOKEN_RE.split(new_text or '')
+    return ''.join(op if isinstance(op, str) else ''.join(new_tokens[op[0]:op[1]]) for op in delta)
+
+
+def iter_versions(article_data, versions_file: str):
+    """
+    Rebuild the earlier versions of an article from the deltas in ``versions_file``.
+
+    Yields:
+        dict: The article at each earlier revision, newest first.
+    """
+    if not os.path.exists(versions_file):
+        return
+    records = []
+    with open(versions_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record['url'] == article_data['url']:
+                    records.append(record)
+
+    content = article_data.get('content')
+    for record in sorted(records, key=lambda r: r['revision'], reverse=True):
+        content = apply_delta(content, record['delta'])
+        yield {
+            'url': record['url'],
+            'title': record['title'],
+            'content': content,
+            'created_at': record['created_at'],
+            'source_website': article_data.get('source_website'),
+            'revision': record['revision']
+        }
@@ -0,0 +1,209 @@
+import gzip
+import io
+import logging
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.client import responses as HTTP_REASONS
+from typing import NamedTuple
+
+
+# Headers describing the transfer rather than the stored body, which is already decoded
+SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+class WarcRecord(NamedTuple):
+    url: str
+    date: str
+    status_code: int
+    headers: dict
+    body: bytes
+
+
+class WarcWriter:
+    """
+    Records raw HTTP responses into WARC/1.0 ``response`` records.
+
+    Every record is its own gzip member, the usual ``.warc.gz`` layout, so files
+    can be read back record by record. Files roll over once they exceed
+    ``max_file_size`` bytes. One writer can be shared by all producers.
+    """
+
+    def __init__(self, directory: str, prefix: str = 'crawl', max_file_size: int = 100 * 1024 * 1024):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_index = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_next_file(self):
+        if self._file is not None:
+            self._file.close()
+        self._file_index += 1
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        path = os.path.join(self.directory, f"{self.prefix}-{timestamp}-{self._file_index:05d}.warc.gz")
+        self._file = open(path, 'ab')
+        logging.info(f"Recording responses to {path}")
+
+    def write_response(self, url: str, response):
+        """Append ``response`` (a ``requests.Response``) as one record."""
+        reason = response.reason or HTTP_REASONS.get(response.status_code, '')
+        http_head = f"HTTP/1.1 {response.status_code} {reason}\r\n"
+        for name, value in response.headers.items():
+            if name.lower() not in SKIPPED_HEADERS:
+                http_head += f"{name}: {value}\r\n"
+        block = (http_head + "\r\n").encode('latin-1', errors='replace') + response.content
+
+        warc_head = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(block)}\r\n"
+            "\r\n"
+        ).encode('utf-8')
+        member = gzip.compress(warc_head + block + b"\r\n\r\n")
+
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.max_file_size:
+                self._open_next_file()
+            self._file.write(member)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _parse_headers(lines):
+    headers = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    return headers
+
+
+def _read_records(f):
+    while True:
+        line = f.readline()
+        if not line:
+            return
+        if not line.startswith(b'WARC/'):
+            continue
+
+        warc_lines = []
+        while True:
+            line = f.readline()
+            if not line or line in (b'\r\n', b'\n'):
+                break
+            warc_lines.append(line.decode('utf-8').rstrip('\r\n'))
+        warc_headers = _parse_headers(warc_lines)
+        block = f.read(int(warc_headers.get('Content-Length', 0)))
+
+        if warc_headers.get('WARC-Type') != 'response':
+            continue
+        head, _, body = block.partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        yield WarcRecord(
+            url=warc_headers.get('WARC-Target-URI'),
+            date=warc_headers.get('WARC-Date'),
+            status_code=int(status_line.split()[1]),
+            headers=_parse_headers(header_lines),
+            body=body
+        )
+
+
+def iter_warc_records(path: str, start: int = 0, end: int = None):
+    """
+    Read the ``response`` records of a ``.warc.gz`` (or plain ``.warc``) file.
+
+    Args:
+        path (str): Archive file
+        start (int): Byte offset of the first record to read, see ``record_offsets``
+        end (int): Byte offset to stop at, defaults to the end of the file
+
+    Yields:
+        WarcRecord: URL, capture date, HTTP status, HTTP headers and body.
+    """
+    if start == 0 and end is None:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            yield from _read_records(f)
+        return
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(end - start)
+    stream = io.BytesIO(data)
+    yield from _read_records(gzip.GzipFile(fileobj=stream) if path.endswith('.gz') else stream)
+
+
+def record_offsets(path: str, chunk_size: int = 1024 * 1024):
+    """
+    Byte offsets at which records start, so an archive can be split between processes.
+
+    In a ``.warc.gz`` these are the starts of the gzip members, one per record
+    when written by ``WarcWriter``. Finding them means decompressing the file once,
+    which is cheap next to parsing the pages. A file compressed as a single
+    member yields a single offset.
+    """
+    offsets = []
+    if path.endswith('.gz'):
+        position = 0
+        with open(path, 'rb') as f:
+            decompressor = None
+            data = f.read(chunk_size)
+            while data:
+                if decompressor is None:
+                    offsets.append(position)
+                    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                decompressor.decompress(data)
+                if decompressor.eof:
+                    rest = decompressor.unused_data
+                    position += len(data) - len(rest)
+                    decompressor = None
+                    data = rest or f.read(chunk_size)
+                else:
+                    position += len(data)
+                    data = f.read(chunk_size)
+        return offsets
+
+    with open(path, 'rb') as f:
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if not line:
+                return offsets
+            if not line.startswith(b'WARC/'):
+                continue
+            offsets.append(position)
+            length = 0
+            while True:
+                line = f.readline()
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+                name, _, value = line.decode('utf-8').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value.strip())
+            f.seek(length, os.SEEK_CUR)
+
+
+def find_archives(paths):
+    """Expand directories into the WARC files they contain, in name order."""
+    archives = []
+    for path in paths:
+        if os.path.isdir(path):
+            archives.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(('.warc', '.warc.gz'))
+            )
+        else:
+            archives.append(path)
+    return archives
@@ -5,12 +5,20 @@ from unittest.mock import Mock, patch, MagicMock, mock_open, call, ANY
 
 import requests
 
+import json
 import os
+import signal
+import subprocess
+import sys
+import tempfile
+import yaml
 from bs4 import BeautifulSoup
 from queue import Queue
 
 from producer_consumer.crawler_producer import CrawlerProducer
 from producer_consumer.crawler_consumer import ArticleConsumer
+from producer_consumer.config import Config
+from producer_consumer.app import CrawlerApp
 
 
 class TestConfig(unittest.TestCase):
@@ -52,7 +60,7 @@ class TestCrawlerProducer(unittest.TestCase):
         self.assertEqual(self.producer.name, 'TestProducer')
         self.assertEqual(self.producer.start_urls, self.start_urls)
         self.assertEqual(len(self.producer.visited_urls), 0)
-        self.assertEqual(self.producer.url_queue, self.start_urls)
+        self.assertEqual(list(self.producer.url_queue), self.start_urls)
 
     def test_is_valid_article_url(self):
         valid_urls = [
@@ -206,5 +214,121 @@ class TestArticleConsumer(unittest.TestCase):
 
 
 
+class TestCrawlerAppBatchMode(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        config_path = os.path.join(self.tmp_dir.name, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump({
+                'producer': {'count': 2, 'produce_interval': 0, 'start_urls': ['https://novinky.cz/clanek/0']},
+                'consumer': {'count': 2, 'consume_interval': 0, 'output_dir': os.path.join(self.tmp_dir.name, 'out')},
+                'queue': {'max_size': 5},
+                'logging': {'level': 'WARNING', 'file': os.path.join(self.tmp_dir.name, 'app.log')}
+            }, f)
+        self.app = CrawlerApp(Config(config_path))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def fake_crawl(producer, url, depth=0):
+        # Every page links to one new article
+        producer.pages_crawled += 1
+        producer.add_url(f"{url}-{producer.name}", depth + 1)
+        return {'url': url, 'title': 'Title', 'content': 'Content',
+                'created_at': '2024-01-01T12:00:00+00:00', 'source_website': 'novinky.cz'}
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR1'), "needs SIGUSR1")
+    def test_signal_handlers_are_opt_in(self):
+        """Test the app only takes over SIGUSR1/SIGUSR2 when asked to"""
+        previous = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+        try:
+            CrawlerApp(self.app.config)
+            self.assertEqual((signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)), previous)
+            self.assertTrue(self.app.install_signal_handlers())
+            self.assertNotEqual(signal.getsignal(signal.SIGUSR1), previous[0])
+        finally:
+            signal.signal(signal.SIGUSR1, previous[0])
+            signal.signal(signal.SIGUSR2, previous[1])
+
+    def test_run_stops_at_max_articles_and_drains(self):
+        """Test batch mode stops at the article limit with the queue fully drained"""
+        with patch.object(CrawlerProducer, 'crawl_url', autospec=True, side_effect=self.fake_crawl):
+            summary = self.app.run(max_articles=10)
+
+        self.assertGreaterEqual(summary['articles'], 10)
+        self.assertEqual(summary['articles'], sum(p.articles_produced for p in self.app.producers))
+        self.assertTrue(self.app.queue.empty())
+        self.assertFalse(any(t.is_alive() for t in self.app.producers + self.app.consumers))
+        # Both consumers write into one store
+        self.assertTrue(all(c.store is self.app.store for c in self.app.consumers))
+        self.assertEqual(len(self.app.store.articles), summary['articles'])
+
+    def test_run_stops_at_max_pages(self):
+        """Test batch mode stops at the page limit"""
+        with patch.object(CrawlerProducer, 'crawl_url', autospec=True, side_effect=self.fake_crawl):
+            summary = self.app.run(max_pages=5)
+        self.assertGreaterEqual(summary['pages'], 5)
+        self.assertIn('pages_per_second', summary)
+
+    def test_run_stops_at_time_budget(self):
+        """Test batch mode stops once the time budget is used even without any progress"""
+        with patch.object(CrawlerProducer, 'crawl_url', autospec=True, return_value=None):
+            summary = self.app.run(time_budget=0.2)
+        self.assertEqual(summary['articles'], 0)
+        self.assertLess(summary['seconds'], 5)
+
+
+class TestRecrawlSeeding(unittest.TestCase):
+    def test_schedule_is_seeded_from_store(self):
+        """Test a new recrawl schedule starts with the stored article pages"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_dir = os.path.join(tmp_dir, 'out')
+            os.makedirs(output_dir)
+            stored = [{'url': url, 'title': 'Title', 'content': 'Content',
+                       'created_at': '2024-01-01T12:00:00+00:00', 'source_website': 'novinky.cz'}
+                      for url in ('https://novinky.cz/clanek/1', 'https://novinky.cz/')]
+            with open(os.path.join(output_dir, 'articles.json'), 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+            config_path = os.path.join(tmp_dir, 'config.yaml')
+            with open(config_path, 'w') as f:
+                yaml.safe_dump({
+                    'producer': {'count': 1, 'produce_interval': 0, 'start_urls': [],
+                                 'recrawl_file': os.path.join(tmp_dir, 'recrawl.db')},
+                    'consumer': {'count': 1, 'consume_interval': 0, 'output_dir': output_dir},
+                    'queue': {'max_size': 5},
+                    'logging': {'level': 'WARNING', 'file': os.path.join(tmp_dir, 'app.log')}
+                }, f)
+            app = CrawlerApp(Config(config_path))
+            try:
+                self.assertEqual(len(app.recrawl), 1)
+                self.assertIn('https://novinky.cz/clanek/1', app.recrawl)
+            finally:
+                app.recrawl.close()
+
+
+class TestOptionalSubsystems(unittest.TestCase):
+    def test_disabled_subsystems_are_not_imported(self):
+        """Test importing and setting up the app leaves disabled subsystems unloaded"""
+        code = (
+            "import sys, tempfile, yaml\n"
+            "from producer_consumer.app import CrawlerApp\n"
+            "from producer_consumer.config import Config\n"
+            "tmp = tempfile.mkdtemp()\n"
+            "yaml.safe_dump({'producer': {'count': 1, 'produce_interval': 0, 'start_urls': []},\n"
+            "                'consumer': {'count': 1, 'consume_interval': 0, 'output_dir': tmp + '/out'},\n"
+            "                'queue': {'max_size': 5}, 'logging': {'level': 'WARNING', 'file': tmp + '/app.log'}},\n"
+            "               open(tmp + '/config.yaml', 'w'))\n"
+            "CrawlerApp(Config(tmp + '/config.yaml'))\n"
+            "print(' '.join(sorted(m for m in sys.modules if m.startswith('producer_consumer.'))))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        loaded = result.stdout.split()
+        for module in ('feed_discovery', 'recrawl', 'search_index', 'sinks', 'warc'):
+            self.assertNotIn(f'producer_consumer.{module}', loaded)
+        self.assertIn('producer_consumer.crawler_producer', loaded)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
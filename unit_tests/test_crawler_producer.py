@@ -25,7 +25,7 @@ class TestCrawlerProducer(unittest.TestCase):
         self.assertEqual(self.crawler.produce_interval, 0.1)
         self.assertEqual(self.crawler.start_urls, self.start_urls)
         self.assertEqual(self.crawler.visited_urls, set())
-        self.assertEqual(self.crawler.url_queue, self.start_urls)
+        self.assertEqual(list(self.crawler.url_queue), self.start_urls)
 
     def test_is_valid_article_url_positive(self):
         """Test valid article URLs are correctly identified"""
@@ -148,7 +148,7 @@ class TestCrawlerProducer(unittest.TestCase):
     def test_crawl_url_success(self, mock_get):
         """Test successful URL crawling"""
         mock_response = Mock()
-        mock_response.text = '''
+        mock_response.content = b'''
             <html>
                 <h1 class="article-title">Test Article</h1>
                 <div class="article-content">Test Content</div>
@@ -156,6 +156,7 @@ class TestCrawlerProducer(unittest.TestCase):
                 <a href="https://novinky.cz/clanek/new-article">New Article</a>
             </html>
         '''
+        mock_response.headers = {'Content-Type': 'text/html; charset=utf-8'}
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
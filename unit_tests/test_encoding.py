@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import Mock, patch
+from queue import Queue
+
+from producer_consumer.encoding import (
+    EncodingResolver, charset_from_content_type, sniff_charset, normalize_encoding
+)
+from producer_consumer.crawler_producer import CrawlerProducer
+
+
+class TestCharsetSniffing(unittest.TestCase):
+    def test_charset_from_content_type(self):
+        """Test the charset parameter is read and normalized"""
+        self.assertEqual(charset_from_content_type('text/html; charset=UTF-8'), 'utf-8')
+        self.assertEqual(charset_from_content_type('text/html; charset="windows-1250"'), 'cp1250')
+        self.assertIsNone(charset_from_content_type('text/html'))
+        self.assertIsNone(charset_from_content_type('text/html; charset=no-such-codec'))
+        self.assertIsNone(charset_from_content_type(None))
+
+    def test_sniff_charset(self):
+        """Test <meta> declarations and byte order marks"""
+        self.assertEqual(sniff_charset(b'<html><head><meta charset="iso-8859-2">'), 'iso8859-2')
+        self.assertEqual(sniff_charset(
+            b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1250" />'), 'cp1250')
+        self.assertEqual(sniff_charset(b'\xef\xbb\xbf<html>'), 'utf-8')
+        self.assertIsNone(sniff_charset(b'<html><head><title>x</title>'))
+        self.assertEqual(normalize_encoding('UTF8'), 'utf-8')
+
+
+class TestEncodingResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = EncodingResolver()
+
+    def test_header_wins_and_is_cached_per_host(self):
+        """Test a declared encoding is reused for later pages of the same host"""
+        body = 'Žluťoučký kůň'.encode('cp1250')
+        self.assertEqual(self.resolver.resolve('https://ctk.cz/a', {'Content-Type': 'text/html; charset=cp1250'},
+                                               body), 'cp1250')
+        self.assertEqual(self.resolver.resolve('https://ctk.cz/b', {}, body), 'cp1250')
+        # The cache is per host
+        self.assertEqual(self.resolver.resolve('https://idnes.cz/b', {}, body), 'windows-1250')
+
+    def test_meta_beyond_sniff_window_is_ignored(self):
+        """Test only the first sniff_bytes are searched"""
+        body = b' ' * 2000 + b'<meta charset="iso-8859-2">'
+        self.assertEqual(self.resolver.resolve('https://novinky.cz/a', {}, body), 'utf-8')
+
+    def test_undeclared_pages_fall_back(self):
+        """Test undeclared pages are treated as UTF-8 when valid and windows-1250 otherwise"""
+        self.assertEqual(self.resolver.resolve('https://novinky.cz/a', {}, 'článek'.encode('utf-8')), 'utf-8')
+        self.assertEqual(self.resolver.resolve('https://novinky.cz/b', {}, 'článek'.encode('cp1250')),
+                         'windows-1250')
+
+    @patch('requests.get')
+    def test_crawl_url_decodes_undeclared_legacy_page(self, mock_get):
+        """Test a windows-1250 page without a charset header is extracted correctly"""
+        response = Mock()
+        response.content = ('<html><head><meta charset="windows-1250"></head>'
+                            '<h1>Příliš žluťoučký kůň</h1></html>').encode('cp1250')
+        response.headers = {'Content-Type': 'text/html'}
+        mock_get.return_value = response
+
+        producer = CrawlerProducer('TestProducer', Queue(), 0.1, [], encodings=self.resolver)
+        article = producer.crawl_url('https://novinky.cz/clanek/1')
+        self.assertEqual(article['title'], 'Příliš žluťoučký kůň')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from producer_consumer import export
+from producer_consumer.export import ColumnarReader, export_articles, iter_store
+from producer_consumer.utils import parse_timestamp
+
+
+def make_article(i, created_at='2024-01-01T12:00:00+00:00'):
+    return {'url': f'https://novinky.cz/clanek/{i}', 'title': f'Článek {i}', 'content': f'Obsah článku {i}',
+            'created_at': created_at, 'source_website': 'novinky.cz'}
+
+
+class ExportTestMixin:
+    fmt = None
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, 'articles.json')
+        self.out_dir = os.path.join(self.tmp_dir.name, 'export')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_store(self, articles):
+        with open(self.source, 'w', encoding='utf-8') as f:
+            json.dump(articles, f, ensure_ascii=False)
+
+    def test_incremental_export(self):
+        """Test a second export only appends articles that are new since the first"""
+        self.write_store([make_article(1), make_article(2, created_at='neznámé datum')])
+        stats = export_articles(self.source, self.out_dir, fmt=self.fmt)
+        self.assertEqual((stats['new_rows'], stats['rows']), (2, 2))
+
+        self.write_store([make_article(2), make_article(1), make_article(3)])
+        stats = export_articles(self.source, self.out_dir)
+        self.assertEqual((stats['format'], stats['new_rows'], stats['rows']), (self.fmt, 1, 3))
+
+        stats = export_articles(self.source, self.out_dir)
+        self.assertEqual(stats['new_rows'], 0)
+        self.assertIsNone(stats['part'])
+
+        reader = ColumnarReader(self.out_dir)
+        self.assertEqual(len(reader), 3)
+        rows = list(reader)
+        self.assertEqual([row['url'] for row in rows], [make_article(i)['url'] for i in (1, 2, 3)])
+        self.assertEqual(rows[0]['title'], 'Článek 1')
+        self.assertEqual(rows[0]['created_at'], '2024-01-01T12:00:00+00:00')
+        self.assertIsNone(rows[1]['created_at'])
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), "needs time.tzset")
+    def test_naive_dates_match_the_search_index(self):
+        """Test dates without an offset are exported as local time, like the search index reads them"""
+        self.write_store([make_article(1, created_at='2024-06-01T12:00:00')])
+        self.addCleanup(time.tzset)
+        with patch.dict(os.environ, {'TZ': 'Europe/Prague'}):
+            time.tzset()
+            export_articles(self.source, self.out_dir, fmt=self.fmt)
+            expected = datetime.fromtimestamp(parse_timestamp('2024-06-01T12:00:00'), timezone.utc)
+        self.assertEqual(next(iter(ColumnarReader(self.out_dir)))['created_at'], expected.isoformat())
+        self.assertEqual(expected.hour, 10)
+
+    def test_format_mismatch(self):
+        """Test appending in a different format than the existing export is refused"""
+        self.write_store([make_article(1)])
+        export_articles(self.source, self.out_dir, fmt=self.fmt)
+        other = 'numpy' if self.fmt == 'parquet' else 'parquet'
+        with self.assertRaises(ValueError):
+            export_articles(self.source, self.out_dir, fmt=other)
+
+
+@unittest.skipUnless(export.np is not None, "numpy is not installed")
+class TestNumpyExport(ExportTestMixin, unittest.TestCase):
+    fmt = 'numpy'
+
+    def test_memory_mapped_columns(self):
+        """Test columns are read through memory maps and offsets"""
+        self.write_store([make_article(1), make_article(2)])
+        export_articles(self.source, self.out_dir, fmt='numpy')
+
+        reader = ColumnarReader(self.out_dir)
+        content, = reader.column('content')
+        self.assertIsInstance(content.blob, export.np.memmap)
+        self.assertEqual(len(content), 2)
+        self.assertEqual(content[-1], 'Obsah článku 2')
+        self.assertEqual(str(reader.column('created_at')[0]), '2024-01-01T12:00:00')
+
+
+@unittest.skipUnless(export.pq is not None, "pyarrow is not installed")
+class TestParquetExport(ExportTestMixin, unittest.TestCase):
+    fmt = 'parquet'
+
+    def test_table(self):
+        """Test the parts read back as one Arrow table"""
+        self.write_store([make_article(1)])
+        export_articles(self.source, self.out_dir, fmt='parquet')
+        self.write_store([make_article(1), make_article(2)])
+        export_articles(self.source, self.out_dir, fmt='parquet')
+
+        reader = ColumnarReader(self.out_dir)
+        self.assertEqual(reader.table().num_rows, 2)
+        self.assertEqual(reader.column('source_website').to_pylist(), ['novinky.cz', 'novinky.cz'])
+
+
+class TestIterStore(unittest.TestCase):
+    def test_jsonl_source(self):
+        """Test JSON Lines sink files are read line by line"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'articles.jsonl')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(make_article(1)) + '\n\n' + json.dumps(make_article(2)) + '\n')
+            self.assertEqual([a['url'] for a in iter_store(path)],
+                             [make_article(1)['url'], make_article(2)['url']])
+
+
+if __name__ == '__main__':
+    unittest.main()
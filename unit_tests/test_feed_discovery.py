@@ -0,0 +1,161 @@
+import unittest
+from unittest.mock import Mock, patch
+from io import BytesIO
+import xml.etree.ElementTree as ET
+from queue import Queue
+from datetime import datetime, timezone
+
+import requests
+
+from producer_consumer.feed_discovery import FeedDiscovery, iter_feed_entries, parse_timestamp
+from producer_consumer.crawler_producer import CrawlerProducer
+
+
+RSS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+    <title>Novinky</title>
+    <link>https://www.novinky.cz/</link>
+    <image><url>https://www.novinky.cz/logo.png</url></image>
+    <item>
+        <title>Clanek 2</title>
+        <link>https://www.novinky.cz/clanek/2</link>
+        <pubDate>Tue, 02 Jan 2024 10:00:00 +0100</pubDate>
+    </item>
+    <item>
+        <title>Clanek 1</title>
+        <link>https://www.novinky.cz/clanek/1</link>
+        <pubDate>Mon, 01 Jan 2024 10:00:00 +0100</pubDate>
+    </item>
+</channel></rss>'''
+
+NEWS_SITEMAP = b'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+    <url>
+        <loc>https://www.idnes.cz/zpravy/1</loc>
+        <news:news><news:publication_date>2024-01-01T10:00:00Z</news:publication_date></news:news>
+    </url>
+    <url>
+        <loc>https://www.idnes.cz/zpravy/2</loc>
+        <lastmod>2024-01-03T10:00:00+01:00</lastmod>
+    </url>
+</urlset>'''
+
+SITEMAP_INDEX = b'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <sitemap><loc>https://www.idnes.cz/sitemap-news.xml</loc><lastmod>2024-01-03</lastmod></sitemap>
+</sitemapindex>'''
+
+
+def make_response(body, status_code=200, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.raw = BytesIO(body)
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestFeedParsing(unittest.TestCase):
+    def test_parse_timestamp_formats(self):
+        """Test RSS and ISO dates are normalized to UTC"""
+        expected = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+        self.assertEqual(parse_timestamp('Mon, 01 Jan 2024 10:00:00 +0100'), expected)
+        self.assertEqual(parse_timestamp('2024-01-01T09:00:00Z'), expected)
+        self.assertIsNone(parse_timestamp('not a date'))
+
+    def test_iter_rss_entries(self):
+        """Test RSS items are read and channel-level URLs are skipped"""
+        entries = list(iter_feed_entries(BytesIO(RSS)))
+        self.assertEqual([url for _, url, _ in entries],
+                         ['https://www.novinky.cz/clanek/2', 'https://www.novinky.cz/clanek/1'])
+        self.assertTrue(all(kind == 'article' for kind, _, _ in entries))
+
+    def test_iter_sitemap_entries(self):
+        """Test news sitemaps and sitemap indexes"""
+        entries = list(iter_feed_entries(BytesIO(NEWS_SITEMAP)))
+        self.assertEqual(entries[0], ('article', 'https://www.idnes.cz/zpravy/1',
+                                      datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)))
+        self.assertEqual(len(entries), 2)
+
+        entries = list(iter_feed_entries(BytesIO(SITEMAP_INDEX)))
+        self.assertEqual(entries[0][:2], ('sitemap', 'https://www.idnes.cz/sitemap-news.xml'))
+
+
+    def test_processed_entries_are_detached(self):
+        """Test entries do not pile up under the root while a large sitemap is read"""
+        body = (b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                + b''.join(b'<url><loc>https://www.idnes.cz/zpravy/%d</loc></url>' % i for i in range(1000))
+                + b'</urlset>')
+        roots = []
+        original = ET.iterparse
+
+        def iterparse(*args, **kwargs):
+            for event, elem in original(*args, **kwargs):
+                if not roots:
+                    roots.append(elem)
+                yield event, elem
+
+        with patch('xml.etree.ElementTree.iterparse', iterparse):
+            self.assertEqual(len(list(iter_feed_entries(BytesIO(body)))), 1000)
+        self.assertEqual(len(roots[0]), 0)
+
+
+class TestFeedDiscovery(unittest.TestCase):
+    @patch('requests.get')
+    def test_poll_uses_conditional_requests(self, mock_get):
+        """Test changed feeds are handed out again and unchanged ones answered with 304"""
+        discovery = FeedDiscovery(['https://www.novinky.cz/rss'], poll_interval=0)
+
+        first = make_response(RSS, headers={'ETag': '"v1"'})
+        mock_get.return_value = first
+        self.assertEqual(len(discovery.poll()), 2)
+        first.close.assert_called_once()
+
+        # Producers skip URLs they crawled, so a failed article is offered again
+        mock_get.return_value = make_response(RSS)
+        self.assertEqual(len(discovery.poll()), 2)
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+
+        not_modified = make_response(b'', status_code=304)
+        mock_get.return_value = not_modified
+        self.assertEqual(discovery.poll(), [])
+        not_modified.close.assert_called_once()
+
+    @patch('requests.get')
+    def test_failed_response_is_closed(self, mock_get):
+        """Test error responses release their connection"""
+        response = make_response(b'', status_code=503)
+        response.raise_for_status.side_effect = requests.HTTPError('503')
+        mock_get.return_value = response
+        self.assertEqual(FeedDiscovery(['https://www.novinky.cz/rss']).poll(), [])
+        response.close.assert_called_once()
+
+    @patch('requests.get')
+    def test_poll_follows_sitemap_index(self, mock_get):
+        """Test sitemap index entries are followed to the article sitemap"""
+        mock_get.side_effect = [make_response(SITEMAP_INDEX), make_response(NEWS_SITEMAP)]
+        discovery = FeedDiscovery(['https://www.idnes.cz/sitemap.xml'])
+
+        self.assertEqual(discovery.poll(),
+                         ['https://www.idnes.cz/zpravy/1', 'https://www.idnes.cz/zpravy/2'])
+        # The poll interval has not elapsed yet
+        self.assertEqual(discovery.poll(), [])
+
+    def test_producer_prefers_discovered_urls(self):
+        """Test discovered article URLs are queued ahead of the link walk"""
+        discovery = Mock()
+        discovery.poll.return_value = ['https://www.novinky.cz/clanek/1',
+                                       'https://www.novinky.cz/clanek/2',
+                                       'https://www.novinky.cz/galerie/3']
+        producer = CrawlerProducer('TestProducer', Queue(), 0.1, ['https://www.novinky.cz/'],
+                                   discovery=discovery)
+        producer.visited_urls.add('https://www.novinky.cz/clanek/2')
+
+        producer.discover_urls()
+        self.assertEqual(list(producer.url_queue),
+                         ['https://www.novinky.cz/clanek/1', 'https://www.novinky.cz/'])
+
+
+if __name__ == '__main__':
+    unittest.main()
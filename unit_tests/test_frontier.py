@@ -0,0 +1,157 @@
+import unittest
+import heapq
+import os
+import random
+import tempfile
+from queue import Queue
+from unittest.mock import patch
+
+from producer_consumer.frontier import Frontier
+from producer_consumer.crawler_producer import CrawlerProducer
+
+
+class TestFrontier(unittest.TestCase):
+    def test_pop_order(self):
+        """Test higher priority first, FIFO within the same priority"""
+        frontier = Frontier()
+        frontier.push('a', priority=1)
+        frontier.push('b', priority=3)
+        frontier.push('c', priority=1)
+        frontier.push('d', priority=3)
+
+        self.assertEqual(list(frontier), ['b', 'd', 'a', 'c'])
+        self.assertEqual([frontier.pop()[0] for _ in range(4)], ['b', 'd', 'a', 'c'])
+        self.assertIsNone(frontier.pop())
+
+    def test_max_depth(self):
+        """Test URLs beyond max_depth are rejected"""
+        frontier = Frontier(max_depth=2)
+        self.assertTrue(frontier.push('a', depth=2))
+        self.assertFalse(frontier.push('b', depth=3))
+        self.assertEqual(frontier.pop(), ('a', 2))
+        self.assertEqual(len(frontier), 0)
+
+    def test_max_size_evicts_lowest_priority(self):
+        """Test a full frontier drops its lowest priority URL"""
+        frontier = Frontier(max_size=2)
+        frontier.push('low', priority=0)
+        frontier.push('high', priority=2)
+        self.assertTrue(frontier.push('mid', priority=1))
+        self.assertEqual(list(frontier), ['high', 'mid'])
+
+        # A new URL that would itself be the lowest is not kept
+        self.assertFalse(frontier.push('lowest', priority=-1))
+        self.assertEqual(list(frontier), ['high', 'mid'])
+
+
+class TestSpillingFrontier(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.spill_path = os.path.join(self.tmp_dir.name, 'frontier.db')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_overflow_is_spilled_and_refilled_in_order(self):
+        """Test memory stays bounded while pop order is preserved across disk"""
+        frontier = Frontier(spill_path=self.spill_path, memory_size=4, refill_batch=2)
+        for i in range(20):
+            frontier.push(f'url{i}', priority=i % 5)
+            self.assertLessEqual(len(frontier._entries), 4)
+        self.assertEqual(len(frontier), 20)
+
+        expected = [f'url{i}' for p in range(4, -1, -1) for i in range(20) if i % 5 == p]
+        self.assertEqual(list(frontier), expected)
+
+        popped = []
+        while True:
+            entry = frontier.pop()
+            if entry is None:
+                break
+            self.assertLessEqual(len(frontier._entries), 4)
+            popped.append(entry[0])
+        self.assertEqual(popped, expected)
+        frontier.close()
+
+    def test_max_size_applies_to_spilled_urls(self):
+        """Test the total size stays bounded by evicting the lowest priority spilled URLs"""
+        frontier = Frontier(max_size=6, spill_path=self.spill_path, memory_size=2, refill_batch=2)
+        for i in range(10):
+            frontier.push(f'url{i}', priority=i)
+        self.assertLessEqual(len(frontier), 6 + frontier.refill_batch)
+        self.assertEqual(list(frontier)[:6], [f'url{i}' for i in range(9, 3, -1)])
+        frontier.close()
+
+    def test_no_refill_once_disk_is_empty(self):
+        """Test a drained spill file is not queried again on every pop"""
+        frontier = Frontier(spill_path=self.spill_path, memory_size=4, refill_batch=2)
+        for i in range(6):
+            frontier.push(f'high{i}', priority=5)
+        self.assertEqual([frontier.pop()[0] for _ in range(4)], [f'high{i}' for i in range(4)])
+        frontier.push('low0', priority=0)
+        frontier.push('low1', priority=0)
+
+        with patch.object(frontier, '_refill', wraps=frontier._refill) as refill:
+            popped = [frontier.pop()[0] for _ in range(4)]
+            self.assertIsNone(frontier.pop())
+        self.assertEqual(popped, ['high4', 'high5', 'low0', 'low1'])
+        self.assertEqual(refill.call_count, 1)
+        self.assertEqual(frontier._disk_count, 0)
+        frontier.close()
+
+    def test_random_operations_match_reference_order(self):
+        """Test pops follow priority, then push order, however URLs move between memory and disk"""
+        rng = random.Random(7)
+        frontier = Frontier(spill_path=self.spill_path, memory_size=5, refill_batch=3)
+        reference = []
+        for step in range(2000):
+            if rng.random() < 0.55:
+                priority = rng.choice((0.0, 1.0, 2.0))
+                frontier.push(f'url{step}', priority=priority)
+                heapq.heappush(reference, (-priority, step, f'url{step}'))
+            else:
+                expected = heapq.heappop(reference)[2] if reference else None
+                entry = frontier.pop()
+                self.assertEqual(entry[0] if entry else None, expected, f"step {step}")
+        frontier.close()
+
+    def test_close_persists_frontier(self):
+        """Test URLs are resumed from the spill file after a restart"""
+        frontier = Frontier(spill_path=self.spill_path, memory_size=2)
+        for i in range(5):
+            frontier.push(f'url{i}', depth=1, priority=1)
+        frontier.close()
+
+        resumed = Frontier(spill_path=self.spill_path, memory_size=2)
+        self.assertEqual(len(resumed), 5)
+        self.assertEqual(resumed.pop(), ('url0', 1))
+        resumed.push('new', priority=1)
+        self.assertEqual(list(resumed), ['url1', 'url2', 'url3', 'url4', 'new'])
+        resumed.close()
+
+
+class TestProducerFrontier(unittest.TestCase):
+    def setUp(self):
+        self.producer = CrawlerProducer('TestProducer', Queue(), 0.1, ['https://www.novinky.cz/'],
+                                        max_depth=2)
+
+    def test_url_priority_prefers_articles_and_seed_links(self):
+        """Test articles outrank listing pages and shallow links outrank deep ones"""
+        article_from_seed = self.producer.url_priority('https://www.novinky.cz/clanek/1', 1)
+        deep_article = self.producer.url_priority('https://www.novinky.cz/clanek/2', 2)
+        section_page = self.producer.url_priority('https://www.novinky.cz/domaci', 1)
+
+        self.assertGreater(article_from_seed, deep_article)
+        self.assertGreater(deep_article, section_page)
+
+    def test_links_are_pushed_one_level_deeper(self):
+        """Test depth is tracked through add_url and limited by max_depth"""
+        self.producer.add_url('https://www.novinky.cz/clanek/1', 1)
+        self.producer.add_url('https://www.novinky.cz/clanek/2', 3)
+
+        self.assertEqual(list(self.producer.url_queue),
+                         ['https://www.novinky.cz/clanek/1', 'https://www.novinky.cz/'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import Mock, patch
+from queue import Queue
+
+import requests
+
+from producer_consumer.host_health import HostHealth, CLOSED, OPEN, HALF_OPEN
+from producer_consumer.frontier import Frontier
+from producer_consumer.crawler_producer import CrawlerProducer
+
+
+class TestHostHealth(unittest.TestCase):
+    def setUp(self):
+        self.health = HostHealth(failure_threshold=2, cooldown=10, max_cooldown=40)
+
+    @patch('time.monotonic')
+    def test_breaker_opens_half_opens_and_closes(self, mock_time):
+        """Test the closed -> open -> half-open -> closed cycle"""
+        mock_time.return_value = 100.0
+        self.health.record_failure('idnes.cz')
+        self.assertEqual(self.health.state('idnes.cz'), CLOSED)
+        self.health.record_failure('idnes.cz')
+        self.assertEqual(self.health.state('idnes.cz'), OPEN)
+        self.assertFalse(self.health.allow('idnes.cz'))
+        self.assertEqual(self.health.retry_at('idnes.cz'), 110.0)
+
+        # Other hosts are unaffected
+        self.assertTrue(self.health.allow('novinky.cz'))
+
+        # After the cooldown exactly one probe is allowed
+        mock_time.return_value = 110.0
+        self.assertTrue(self.health.allow('idnes.cz'))
+        self.assertEqual(self.health.state('idnes.cz'), HALF_OPEN)
+        self.assertFalse(self.health.allow('idnes.cz'))
+
+        self.health.record_success('idnes.cz', 0.5)
+        self.assertEqual(self.health.state('idnes.cz'), CLOSED)
+        self.assertTrue(self.health.allow('idnes.cz'))
+
+    @patch('time.monotonic')
+    def test_failed_probe_doubles_cooldown(self, mock_time):
+        """Test a failing half-open probe reopens the breaker for longer"""
+        mock_time.return_value = 0.0
+        self.health.record_failure('ctk.cz')
+        self.health.record_failure('ctk.cz')
+
+        mock_time.return_value = 10.0
+        self.assertTrue(self.health.allow('ctk.cz'))
+        self.health.record_failure('ctk.cz')
+        self.assertEqual(self.health.state('ctk.cz'), OPEN)
+        self.assertEqual(self.health.retry_at('ctk.cz'), 30.0)
+
+    def test_adaptive_timeout(self):
+        """Test timeouts follow the latency percentile within the configured bounds"""
+        self.assertEqual(self.health.timeout_for('novinky.cz'), 10)
+        for _ in range(20):
+            self.health.record_success('novinky.cz', 0.2)
+        self.assertEqual(self.health.timeout_for('novinky.cz'), 2)
+        for _ in range(20):
+            self.health.record_success('novinky.cz', 1.0)
+        self.assertAlmostEqual(self.health.timeout_for('novinky.cz'), 3.0)
+
+
+class TestFrontierDeferral(unittest.TestCase):
+    @patch('time.monotonic')
+    def test_deferred_urls_rejoin_when_due(self, mock_time):
+        """Test deferred URLs are held back until their time has come"""
+        mock_time.return_value = 0.0
+        frontier = Frontier()
+        frontier.defer('https://idnes.cz/zpravy/1', 1, 3.0, until=5.0)
+        frontier.push('https://novinky.cz/clanek/1', 1, 2.0)
+
+        self.assertEqual(len(frontier), 2)
+        self.assertEqual(frontier.pop(), ('https://novinky.cz/clanek/1', 1))
+        self.assertIsNone(frontier.pop())
+
+        mock_time.return_value = 5.0
+        self.assertEqual(frontier.pop(), ('https://idnes.cz/zpravy/1', 1))
+
+
+class TestProducerHostHealth(unittest.TestCase):
+    def setUp(self):
+        self.health = HostHealth(failure_threshold=1, cooldown=60)
+        self.producer = CrawlerProducer('TestProducer', Queue(), 0, [], host_health=self.health)
+
+    @patch('requests.get')
+    def test_failures_are_recorded(self, mock_get):
+        """Test network errors and 5xx responses trip the breaker"""
+        mock_get.side_effect = requests.Timeout()
+        self.assertIsNone(self.producer.crawl_url('https://idnes.cz/zpravy/1'))
+        self.assertEqual(self.health.state('idnes.cz'), OPEN)
+
+        response = Mock(status_code=503)
+        response.raise_for_status.side_effect = requests.HTTPError()
+        mock_get.side_effect = None
+        mock_get.return_value = response
+        self.assertIsNone(self.producer.crawl_url('https://novinky.cz/clanek/1'))
+        self.assertEqual(self.health.state('novinky.cz'), OPEN)
+
+    @patch('requests.get')
+    def test_tripped_host_is_deferred(self, mock_get):
+        """Test the run loop defers URLs of a tripped host and crawls healthy ones"""
+        self.health.record_failure('idnes.cz')
+        self.producer.add_url('https://idnes.cz/zpravy/1', 1)
+        self.producer.add_url('https://novinky.cz/clanek/1', 1)
+
+        crawled = []
+
+        def crawl(url, depth):
+            crawled.append(url)
+            self.producer.stop()
+
+        with patch.object(self.producer, 'crawl_url', side_effect=crawl):
+            self.producer.run()
+
+        self.assertEqual(crawled, ['https://novinky.cz/clanek/1'])
+        self.assertEqual(len(self.producer.url_queue._deferred), 1)
+        mock_get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import os
+import signal
+import tempfile
+import threading
+import time
+from queue import Queue
+from unittest.mock import Mock
+
+from producer_consumer.profiling import SamplingProfiler, StageTimer, install_signal_handlers, toggle_sampling
+from producer_consumer.crawler_producer import CrawlerProducer
+from producer_consumer.crawler_consumer import ArticleConsumer
+
+
+def busy_wait(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_totals_per_thread_and_stage(self):
+        """Test calls, wall and CPU time are summed per thread and stage"""
+        timer = StageTimer()
+        timer.add('Producer-1', 'fetch', 0.5, 0.01)
+        timer.add('Producer-1', 'fetch', 0.25, 0.01)
+        timer.add('Consumer-1', 'persist', 0.1, 0.1)
+        with timer.stage('parse'):
+            pass
+
+        snapshot = timer.snapshot()
+        count, wall, cpu = snapshot['Producer-1']['fetch']
+        self.assertEqual(count, 2)
+        self.assertAlmostEqual(wall, 0.75)
+        self.assertAlmostEqual(cpu, 0.02)
+        self.assertEqual(snapshot[threading.current_thread().name]['parse'][0], 1)
+
+        report = timer.report()
+        self.assertIn('Producer-1', report)
+        self.assertIn('persist', report)
+
+    def test_producer_and_consumer_stages(self):
+        """Test the pipeline records its stages on a shared timer"""
+        timer = StageTimer()
+        producer = CrawlerProducer('TestProducer', Queue(), 0, [], timer=timer)
+        response = Mock(content='<h1>Titulek</h1><a href="/clanek/2">x</a>'.encode('utf-8'),
+                        headers={'Content-Type': 'text/html; charset=utf-8'})
+        article, _ = producer.parse_response('https://novinky.cz/clanek/1', response)
+        self.assertEqual(article['title'], 'Titulek')
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            consumer = ArticleConsumer('TestConsumer', Queue(), 0, output_dir=tmp_dir, save_every=1, timer=timer)
+            consumer.save_article(article)
+
+        stages = timer.snapshot()[threading.current_thread().name]
+        for stage in ('decode', 'parse', 'extract', 'dedup', 'persist'):
+            self.assertIn(stage, stages)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_other_threads(self):
+        """Test stacks of all threads are sampled and dumped in collapsed format"""
+        stop_event = threading.Event()
+        worker = threading.Thread(target=busy_wait, args=(stop_event,), name='Busy')
+        worker.start()
+        profiler = SamplingProfiler(interval=0.001)
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                self.assertIsNone(toggle_sampling(profiler, tmp_dir))
+                self.assertTrue(profiler.running)
+                time.sleep(0.1)
+                path = toggle_sampling(profiler, tmp_dir)
+                self.assertFalse(profiler.running)
+                with open(path, encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+                self.assertEqual(os.path.dirname(path), tmp_dir)
+        finally:
+            stop_event.set()
+            worker.join()
+
+        self.assertTrue(any(line.startswith('Busy;') and 'busy_wait' in line for line in lines))
+        self.assertTrue(all(not line.startswith('SamplingProfiler') for line in lines))
+        self.assertTrue(profiler.top(3))
+
+
+@unittest.skipUnless(hasattr(signal, 'SIGUSR2'), "needs SIGUSR2")
+class TestSignalHandlers(unittest.TestCase):
+    def setUp(self):
+        self.previous = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+
+    def tearDown(self):
+        signal.signal(signal.SIGUSR1, self.previous[0])
+        signal.signal(signal.SIGUSR2, self.previous[1])
+
+    def test_report_signal_does_not_take_the_timer_lock(self):
+        """Test SIGUSR2 arriving while the timer lock is held returns at once and logs later"""
+        timer = StageTimer()
+        timer.add('Producer-1', 'fetch', 0.5, 0.01)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertTrue(install_signal_handlers(SamplingProfiler(), timer, tmp_dir))
+        handler = signal.getsignal(signal.SIGUSR2)
+
+        with self.assertLogs(level='INFO') as logs:
+            with timer._lock:
+                caller = threading.Thread(target=handler, args=(signal.SIGUSR2, None), daemon=True)
+                caller.start()
+                caller.join(1)
+                self.assertFalse(caller.is_alive())
+            for _ in range(100):
+                if logs.output:
+                    break
+                time.sleep(0.01)
+        self.assertIn('Producer-1', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+import json
+import os
+import tempfile
+from queue import Queue
+
+from producer_consumer.recrawl import RecrawlSchedule
+from producer_consumer.versions import CHANGED, NEW, UNCHANGED, apply_delta, iter_versions, make_delta
+from producer_consumer.utils import parse_timestamp
+from producer_consumer.crawler_producer import CrawlerProducer
+from producer_consumer.crawler_consumer import ArticleConsumer, ArticleStore
+from producer_consumer.search_index import ArticleIndex
+
+HOUR = 3600
+DAY = 86400
+
+
+def make_article(content='Vláda schválila rozpočet.', title='Rozpočet'):
+    return {'url': 'https://novinky.cz/clanek/1', 'title': title, 'content': content,
+            'created_at': '2024-01-01T00:00:00+00:00', 'source_website': 'novinky.cz'}
+
+
+class TestRecrawlSchedule(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.schedule = RecrawlSchedule(os.path.join(self.tmp_dir.name, 'recrawl.db'))
+        self.created = parse_timestamp(make_article()['created_at'])
+
+    def tearDown(self):
+        self.schedule.close()
+        self.tmp_dir.cleanup()
+
+    def test_interval_grows_with_age(self):
+        """Test fresh articles are revisited often, old ones rarely and very old ones never"""
+        self.assertEqual(self.schedule.next_check(self.created, self.created + 10), self.created + 10 + HOUR)
+        self.assertEqual(self.schedule.next_check(self.created, self.created + DAY), self.created + 1.5 * DAY)
+        self.assertEqual(self.schedule.next_check(self.created, self.created + 20 * DAY), self.created + 27 * DAY)
+        self.assertIsNone(self.schedule.next_check(self.created, self.created + 31 * DAY))
+
+    def test_change_detection(self):
+        """Test content hashes tell new, unchanged and changed versions apart"""
+        article = make_article()
+        self.assertEqual(self.schedule.check(article), (NEW, 0))
+        self.schedule.record(article, 0, now=self.created + DAY)
+        self.assertEqual(self.schedule.check(make_article()), (UNCHANGED, 0))
+        self.assertEqual(self.schedule.check(make_article(content='Vláda neschválila rozpočet.')), (CHANGED, 1))
+        self.assertIn(article['url'], self.schedule)
+
+    def test_due_urls_are_leased(self):
+        """Test a due URL is handed out once until its lease runs out"""
+        self.schedule.record(make_article(), 0, now=self.created + DAY)
+        self.assertEqual(self.schedule.due(now=self.created + DAY + 1), [])
+
+        due_at = self.created + 1.5 * DAY
+        self.assertEqual(self.schedule.due(now=due_at), [make_article()['url']])
+        self.assertEqual(self.schedule.due(now=due_at), [])
+        self.assertEqual(self.schedule.due(now=due_at + self.schedule.lease), [make_article()['url']])
+
+    def test_schedule_survives_restart(self):
+        """Test hashes and revisions are read back from disk"""
+        self.schedule.record(make_article(), 3)
+        self.schedule.close()
+        self.schedule = RecrawlSchedule(os.path.join(self.tmp_dir.name, 'recrawl.db'))
+        self.assertEqual(self.schedule.check(make_article(content='Nový text')), (CHANGED, 4))
+
+    def test_first_created_at_is_kept(self):
+        """Test undated pages stamped with the crawl time still age between visits"""
+        first = dict(make_article(), created_at='2024-01-01T00:00:00+00:00')
+        self.schedule.record(first, 0, now=self.created + DAY)
+        later = dict(make_article(content='Nový text'), created_at='2024-01-10T00:00:00+00:00')
+        self.schedule.record(later, 1, now=self.created + 20 * DAY)
+        self.assertEqual(self.schedule.due(now=self.created + 27 * DAY - 1), [])
+        self.assertEqual(self.schedule.due(now=self.created + 27 * DAY), [first['url']])
+
+    def test_seed_from_stored_articles(self):
+        """Test stored articles are scheduled once without overwriting known ones"""
+        self.schedule.record(make_article(), 2)
+        stored = [dict(make_article(content='Jiný obsah')),
+                  dict(make_article(), url='https://novinky.cz/clanek/2', revision=1)]
+        self.assertEqual(self.schedule.seed(stored), 1)
+        self.assertEqual(self.schedule.check(make_article()), (UNCHANGED, 2))
+        self.assertEqual(self.schedule.check(stored[1]), (UNCHANGED, 1))
+        self.assertEqual(self.schedule.seed(stored), 0)
+
+
+class TestDeltas(unittest.TestCase):
+    def test_round_trip(self):
+        """Test a delta rebuilds the old text from the new one"""
+        old = 'Vláda dnes schválila rozpočet na příští rok.  Opozice protestovala.'
+        new = 'Vláda včera schválila rozpočet na příští rok. Opozice protestovala a odešla.'
+        delta = make_delta(new, old)
+        self.assertEqual(apply_delta(new, delta), old)
+        self.assertEqual(make_delta(new, new), [[0, len(new.split()) * 2 - 1]])
+
+
+class TestVersionedUpdates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.schedule = RecrawlSchedule(os.path.join(self.tmp_dir.name, 'recrawl.db'))
+        self.queue = Queue()
+        self.producer = CrawlerProducer('TestProducer', self.queue, 0, [], recrawl=self.schedule)
+
+    def tearDown(self):
+        self.schedule.close()
+        self.tmp_dir.cleanup()
+
+    def test_producer_queues_only_changes(self):
+        """Test unchanged recrawls are dropped and changed ones queued with a revision"""
+        self.assertTrue(self.producer.produce(make_article()))
+        self.assertFalse(self.producer.produce(make_article()))
+        self.assertTrue(self.producer.produce(make_article(content='Opravený text.')))
+
+        first, second = self.queue.get_nowait(), self.queue.get_nowait()
+        self.assertNotIn('revision', first)
+        self.assertEqual(second['revision'], 1)
+        self.assertTrue(self.queue.empty())
+
+    def test_known_urls_are_skipped_unless_due(self):
+        """Test scheduled URLs are only crawled again when they are due"""
+        url = make_article()['url']
+        self.producer.produce(make_article())
+        self.producer.visited_urls.clear()
+        self.assertTrue(self.producer.is_known(url))
+        self.producer._recrawl_urls.add(url)
+        self.assertFalse(self.producer.is_known(url))
+
+    def test_only_article_urls_are_scheduled(self):
+        """Test listing pages are neither queued nor recorded in the schedule"""
+        home = dict(make_article(), url='https://novinky.cz/')
+        self.assertFalse(self.producer.produce(home))
+        self.assertNotIn(home['url'], self.schedule)
+        self.assertTrue(self.queue.empty())
+
+    def test_consumer_stores_deltas(self):
+        """Test a changed version replaces the stored article and the old one is kept as a delta"""
+        index = ArticleIndex(os.path.join(self.tmp_dir.name, 'articles.db'))
+        consumer = ArticleConsumer('TestConsumer', self.queue, 0, output_dir=self.tmp_dir.name,
+                                   search_index=index, save_every=0)
+        consumer.save_article(make_article())
+        updated = dict(make_article(content='Vláda schválila upravený rozpočet.', title='Nový rozpočet'),
+                       revision=1)
+        consumer.save_article(updated)
+        # Stale or repeated revisions are ignored
+        consumer.save_article(dict(make_article(content='Starší verze'), revision=1))
+
+        self.assertEqual(consumer.articles, [updated])
+        self.assertEqual(consumer.articles_updated, 1)
+        versions = list(iter_versions(updated, consumer.versions_file))
+        self.assertEqual(len(versions), 1)
+        self.assertEqual(versions[0]['content'], make_article()['content'])
+        self.assertEqual(versions[0]['title'], 'Rozpočet')
+        self.assertEqual(versions[0]['revision'], 0)
+
+        self.assertEqual([a['title'] for a in index.search('upravený')], ['Nový rozpočet'])
+        self.assertEqual(index.search('Rozpočet'), index.search('upravený'))
+        self.assertEqual(len(index), 1)
+        index.close()
+
+    def test_consumers_share_the_store(self):
+        """Test a revision taken by another consumer updates the stored article instead of adding a copy"""
+        store = ArticleStore(self.tmp_dir.name)
+        first, second = (ArticleConsumer(f'Consumer-{i}', self.queue, 0, store=store, save_every=0)
+                         for i in (1, 2))
+        first.save_article(make_article())
+        updated = dict(make_article(content='Opravený text.'), revision=1)
+        self.assertTrue(second.save_article(updated))
+
+        self.assertEqual(first.articles, [updated])
+        self.assertEqual(len(list(iter_versions(updated, store.versions_file))), 1)
+        first.save_to_file()
+        with open(store.articles_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [updated])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+import json
+import os
+import tempfile
+from queue import Queue
+from unittest.mock import patch
+
+import yaml
+
+from producer_consumer.search_index import ArticleIndex
+from producer_consumer.crawler_consumer import ArticleConsumer
+from producer_consumer.app import CrawlerApp
+from producer_consumer.config import Config
+
+
+class TestArticleIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = ArticleIndex(os.path.join(self.tmp_dir.name, 'articles.db'))
+        self.articles = [
+            {
+                'url': 'https://novinky.cz/clanek/1',
+                'title': 'Vláda schválila rozpočet',
+                'content': 'Poslanci dnes projednali státní rozpočet na příští rok.',
+                'created_at': '2024-01-01T12:00:00+00:00',
+                'source_website': 'novinky.cz'
+            },
+            {
+                'url': 'https://idnes.cz/zpravy/2',
+                'title': 'Počasí na víkend',
+                'content': 'Meteorologové slibují sníh a mráz.',
+                'created_at': '2024-02-01T08:00:00+00:00',
+                'source_website': 'idnes.cz'
+            },
+            {
+                'url': 'https://idnes.cz/zpravy/3',
+                'title': 'Rozpočet kraje',
+                'content': 'Krajský rozpočet počítá s deficitem.',
+                'created_at': '2024-03-01T08:00:00+00:00',
+                'source_website': 'idnes.cz'
+            }
+        ]
+        self.index.add_articles(self.articles)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_duplicate_urls_are_ignored(self):
+        """Test re-adding an indexed URL does not create a second entry"""
+        self.assertFalse(self.index.add_article(self.articles[0]))
+        self.assertEqual(len(self.index), 3)
+
+    def test_search_by_term_ignores_diacritics(self):
+        """Test Czech terms match with and without accents"""
+        with_accents = {a['url'] for a in self.index.search('rozpočet')}
+        without_accents = {a['url'] for a in self.index.search('rozpocet')}
+        self.assertEqual(with_accents, {'https://novinky.cz/clanek/1', 'https://idnes.cz/zpravy/3'})
+        self.assertEqual(with_accents, without_accents)
+
+    def test_search_by_source_and_date_range(self):
+        """Test filtering by source_website and created_at range"""
+        results = self.index.search(source_website='idnes.cz')
+        self.assertEqual([a['url'] for a in results],
+                         ['https://idnes.cz/zpravy/3', 'https://idnes.cz/zpravy/2'])
+
+        results = self.index.search('rozpocet', created_from='2024-02-01', created_to='2024-12-31')
+        self.assertEqual([a['url'] for a in results], ['https://idnes.cz/zpravy/3'])
+
+    def test_date_range_compares_instants(self):
+        """Test a date-only upper bound covers the whole day and UTC offsets are honoured"""
+        self.index.add_articles([
+            {'url': 'https://ctk.cz/clanek/4', 'title': 'Silvestr', 'content': 'Ohňostroj',
+             'created_at': '2024-12-31T12:00:00+00:00', 'source_website': 'ctk.cz'},
+            # 00:30 in Prague is still 31 December in UTC
+            {'url': 'https://ctk.cz/clanek/5', 'title': 'Nový rok', 'content': 'Novoroční projev',
+             'created_at': '2025-01-01T00:30:00+01:00', 'source_website': 'ctk.cz'},
+            {'url': 'https://ctk.cz/clanek/6', 'title': 'Leden', 'content': 'Mráz',
+             'created_at': '2025-01-01T12:00:00+00:00', 'source_website': 'ctk.cz'},
+        ])
+        results = self.index.search(source_website='ctk.cz', created_from='2024-12-31', created_to='2024-12-31')
+        self.assertIn('https://ctk.cz/clanek/4', [a['url'] for a in results])
+        self.assertNotIn('https://ctk.cz/clanek/6', [a['url'] for a in results])
+
+        results = self.index.search(source_website='ctk.cz', created_from='2024-12-31T23:00:00+00:00',
+                                    created_to='2025-01-01T11:00:00+00:00')
+        self.assertEqual([a['url'] for a in results], ['https://ctk.cz/clanek/5'])
+
+        results = self.index.search(source_website='ctk.cz', created_to='2024-12-31T23:59:59+00:00')
+        self.assertEqual([a['url'] for a in results], ['https://ctk.cz/clanek/5', 'https://ctk.cz/clanek/4'])
+
+        with self.assertRaises(ValueError):
+            self.index.search(created_to='včera')
+
+    def test_app_backfills_stored_articles_once(self):
+        """Test articles saved before the index existed are indexed once when the app starts"""
+        output_dir = os.path.join(self.tmp_dir.name, 'out')
+        os.makedirs(output_dir)
+        stored = dict(self.articles[0], url='https://novinky.cz/clanek/9', title='Uložený článek')
+        with open(os.path.join(output_dir, 'articles.json'), 'w', encoding='utf-8') as f:
+            json.dump([self.articles[1], stored], f)
+        config_path = os.path.join(self.tmp_dir.name, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump({
+                'producer': {'count': 1, 'produce_interval': 0, 'start_urls': []},
+                'consumer': {'count': 3, 'consume_interval': 0, 'output_dir': output_dir,
+                             'index_file': self.index.db_path},
+                'queue': {'max_size': 5},
+                'logging': {'level': 'WARNING', 'file': os.path.join(self.tmp_dir.name, 'app.log')}
+            }, f)
+
+        with patch.object(ArticleIndex, 'add_articles', autospec=True,
+                          side_effect=ArticleIndex.add_articles) as add_articles:
+            app = CrawlerApp(Config(config_path))
+        app.search_index.close()
+        self.assertEqual(add_articles.call_count, 1)
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual([a['url'] for a in self.index.search('ulozeny')], ['https://novinky.cz/clanek/9'])
+
+    def test_search_term_with_query_syntax(self):
+        """Test FTS5 operators in user input are treated as plain words"""
+        self.assertEqual(self.index.search('"rozpočet" AND OR *'), [])
+
+    def test_consumer_updates_index(self):
+        """Test ArticleConsumer indexes articles as they are saved"""
+        consumer = ArticleConsumer("TestConsumer", Queue(), 0.1,
+                                   os.path.join(self.tmp_dir.name, 'out'), search_index=self.index)
+        consumer.save_article({
+            'url': 'https://ctk.cz/clanek/4',
+            'title': 'Nový článek',
+            'content': 'Obsah',
+            'created_at': '2024-04-01T08:00:00+00:00',
+            'source_website': 'ctk.cz'
+        })
+        self.assertEqual([a['url'] for a in self.index.search('clanek')], ['https://ctk.cz/clanek/4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import tempfile
+from queue import Queue
+from unittest.mock import patch
+
+from producer_consumer.seen_set import SeenUrlSet, url_hash
+from producer_consumer.crawler_producer import CrawlerProducer
+
+
+class TestSeenUrlSet(unittest.TestCase):
+    def test_add_and_contains(self):
+        """Test membership and that adding a URL twice is a no-op"""
+        seen = SeenUrlSet()
+        self.assertTrue(seen.add('https://novinky.cz/clanek/1'))
+        self.assertFalse(seen.add('https://novinky.cz/clanek/1'))
+        self.assertIn('https://novinky.cz/clanek/1', seen)
+        self.assertNotIn('https://novinky.cz/clanek/2', seen)
+        self.assertEqual(len(seen), 1)
+
+    def test_urls_are_normalized(self):
+        """Test trivially different spellings of a URL are treated as one"""
+        seen = SeenUrlSet()
+        seen.add('https://Novinky.cz:443/clanek/1/#comments')
+        self.assertIn('https://novinky.cz/clanek/1', seen)
+        self.assertEqual(url_hash('HTTPS://novinky.cz/clanek/1'), url_hash('https://novinky.cz/clanek/1'))
+
+    def test_table_grows(self):
+        """Test the table resizes and keeps every URL"""
+        seen = SeenUrlSet(initial_size=8, bloom_capacity=1000)
+        urls = [f'https://idnes.cz/zpravy/{i}' for i in range(1000)]
+        for url in urls:
+            seen.add(url)
+        self.assertEqual(len(seen), 1000)
+        self.assertGreaterEqual(len(seen._table), 2000)
+        self.assertTrue(all(url in seen for url in urls))
+        self.assertNotIn('https://idnes.cz/zpravy/1000', seen)
+
+    def test_save_and_load(self):
+        """Test the set survives a round trip through a file"""
+        seen = SeenUrlSet(bloom_capacity=100)
+        for i in range(50):
+            seen.add(f'https://ctk.cz/clanek/{i}')
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'visited.bin')
+            seen.save(path)
+            loaded = SeenUrlSet.load(path)
+
+        self.assertEqual(len(loaded), 50)
+        self.assertIsNotNone(loaded.bloom)
+        self.assertIn('https://ctk.cz/clanek/49', loaded)
+        self.assertNotIn('https://ctk.cz/clanek/50', loaded)
+        self.assertTrue(loaded.add('https://ctk.cz/clanek/50'))
+
+    def test_shared_between_producers(self):
+        """Test producers sharing a set skip each other's URLs"""
+        seen = SeenUrlSet()
+        first = CrawlerProducer('P1', Queue(), 0.1, [], visited_urls=seen)
+        second = CrawlerProducer('P2', Queue(), 0.1, [], visited_urls=seen)
+        first.visited_urls.add('https://novinky.cz/clanek/1')
+        self.assertIn('https://novinky.cz/clanek/1', second.visited_urls)
+
+
+    def test_restart_crawls_seeds_again(self):
+        """Test start URLs are fetched again after a restart while known articles are skipped"""
+        home = 'https://www.novinky.cz/'
+        article = 'https://www.novinky.cz/clanek/1'
+
+        def run_producer(visited_urls):
+            producer = CrawlerProducer('P1', Queue(), 0, [home], visited_urls=visited_urls)
+            crawled = []
+
+            def crawl(url, depth=0):
+                crawled.append(url)
+                if url == home:
+                    producer.add_url(article, depth + 1)
+                # The frontier restarts from the seed once drained; stop on the second visit
+                if crawled.count(home) == 2:
+                    producer.stop()
+                return {'url': url, 'title': 'T', 'content': 'C',
+                        'created_at': '2024-01-01T12:00:00+00:00', 'source_website': 'novinky.cz'}
+
+            seed_frontier = producer.seed_frontier
+            reseeds = []
+
+            def reseed():
+                # Guard against a seed that is never crawled again, which would loop forever
+                reseeds.append(1)
+                if len(reseeds) > 10:
+                    producer.stop()
+                seed_frontier()
+
+            with patch.object(producer, 'crawl_url', side_effect=crawl), \
+                    patch.object(producer, 'seed_frontier', side_effect=reseed):
+                producer.run()
+            return crawled
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'visited.bin')
+            seen = SeenUrlSet()
+            self.assertEqual(run_producer(seen), [home, article, home])
+            self.assertNotIn(home, seen)
+            seen.save(path)
+
+            self.assertEqual(run_producer(SeenUrlSet.load(path)), [home, home])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+import asyncio
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import yaml
+from queue import Queue
+from unittest.mock import Mock, patch
+
+from producer_consumer.sinks import (
+    BufferSink, JsonlFileSink, StdoutSink, UnixSocketSink, create_sink
+)
+from producer_consumer.crawler_consumer import SinkConsumer
+from producer_consumer.crawler_producer import CrawlerProducer
+from producer_consumer.config import Config
+from producer_consumer.stream import iter_articles, aiter_articles
+
+
+def make_article(i):
+    return {'url': f'https://novinky.cz/clanek/{i}', 'title': f'Článek {i}', 'content': 'Obsah',
+            'created_at': '2024-01-01T12:00:00+00:00', 'source_website': 'novinky.cz'}
+
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_jsonl_file_sink_appends(self):
+        """Test batches are appended as JSON Lines without rewriting the file"""
+        path = os.path.join(self.tmp_dir.name, 'out', 'articles.jsonl')
+        sink = JsonlFileSink(path)
+        sink.write_batch([make_article(1), make_article(2)])
+        sink.write_batch([make_article(3)])
+        sink.close()
+
+        with open(path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([a['url'] for a in lines], [make_article(i)['url'] for i in (1, 2, 3)])
+        self.assertEqual(lines[0]['title'], 'Článek 1')
+
+    def test_stdout_sink(self):
+        """Test the stdout sink writes one JSON object per line"""
+        stream = io.StringIO()
+        StdoutSink(stream).write_batch([make_article(1), make_article(2)])
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+
+    def test_unix_socket_sink(self):
+        """Test articles reach a listening Unix socket"""
+        path = os.path.join(self.tmp_dir.name, 'articles.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+
+        sink = UnixSocketSink(path)
+        sink.write_batch([make_article(1)])
+        connection, _ = server.accept()
+        sink.close()
+        data = connection.makefile('r', encoding='utf-8').read()
+        connection.close()
+        server.close()
+        self.assertEqual(json.loads(data)['url'], make_article(1)['url'])
+
+    def test_unix_socket_sink_without_listener(self):
+        """Test delivery errors are logged instead of raised"""
+        UnixSocketSink(os.path.join(self.tmp_dir.name, 'missing.sock')).write_batch([make_article(1)])
+
+    def test_create_sink(self):
+        self.assertIsInstance(create_sink('stdout'), StdoutSink)
+        self.assertIsInstance(create_sink('socket:/tmp/x.sock'), UnixSocketSink)
+        with self.assertRaises(ValueError):
+            create_sink('parquet:/tmp/x')
+
+    def test_buffer_sink_blocks_until_read(self):
+        """Test a full buffer holds the writer back until articles are read"""
+        buffer = BufferSink(maxsize=2)
+        writer = threading.Thread(target=buffer.write_batch, args=([make_article(i) for i in range(5)],))
+        writer.start()
+        writer.join(timeout=0.3)
+        self.assertTrue(writer.is_alive())
+
+        read = [buffer.get()['url'] for _ in range(5)]
+        writer.join(timeout=1)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(read, [make_article(i)['url'] for i in range(5)])
+
+        buffer.close()
+        self.assertIsNone(buffer.get())
+
+    def test_sink_consumer_batches(self):
+        """Test the sink consumer hands queued articles to every sink in batches"""
+        queue = Queue()
+        for i in range(7):
+            queue.put(make_article(i))
+        first, second = Mock(), Mock()
+        consumer = SinkConsumer('TestConsumer', queue, [first, second], batch_size=5)
+        consumer.start()
+        consumer.stop()
+        consumer.join(timeout=5)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual([len(c.args[0]) for c in first.write_batch.call_args_list], [5, 2])
+        self.assertEqual(first.write_batch.call_args_list, second.write_batch.call_args_list)
+        self.assertEqual(consumer.articles_saved, 7)
+        self.assertEqual(queue.unfinished_tasks, 0)
+
+
+class TestStreamingApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp_dir.name, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump({
+                'producer': {'count': 1, 'produce_interval': 0, 'start_urls': ['https://novinky.cz/clanek/0']},
+                'consumer': {'count': 1, 'consume_interval': 0, 'output_dir': os.path.join(self.tmp_dir.name, 'out'),
+                             'batch_size': 3},
+                'queue': {'max_size': 2},
+                'logging': {'level': 'WARNING', 'file': os.path.join(self.tmp_dir.name, 'app.log')}
+            }, f)
+        self.crawled = []
+        self.patcher = patch.object(CrawlerProducer, 'crawl_url', autospec=True, side_effect=self.fake_crawl)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def fake_crawl(self, producer, url, depth=0):
+        self.crawled.append(url)
+        producer.add_url(f"https://novinky.cz/clanek/{len(self.crawled)}", depth + 1)
+        return make_article(len(self.crawled) - 1)
+
+    def test_iter_articles_with_backpressure(self):
+        """Test articles stream out and a slow reader holds the producer back"""
+        articles = iter_articles(Config(self.config_path), buffer_size=2)
+        first = next(articles)
+        self.assertEqual(first['url'], 'https://novinky.cz/clanek/0')
+
+        # Producer can be at most buffer + consumer batch + queue + one pending article ahead
+        threading.Event().wait(0.3)
+        self.assertLessEqual(len(self.crawled), 1 + 2 + 3 + 2 + 1)
+
+        rest = [next(articles) for _ in range(9)]
+        articles.close()
+        self.assertEqual([a['url'] for a in rest], [make_article(i)['url'] for i in range(1, 10)])
+
+    def test_iter_articles_ends_at_limit(self):
+        """Test the iterator finishes on its own when a batch limit is reached"""
+        articles = list(iter_articles(Config(self.config_path), max_articles=5))
+        self.assertGreaterEqual(len(articles), 5)
+
+    def test_iter_articles_skips_listing_pages(self):
+        """Test start pages crawled every cycle are not streamed as articles"""
+        home = 'https://novinky.cz/'
+        with open(self.config_path) as f:
+            settings = yaml.safe_load(f)
+        settings['producer']['start_urls'] = [home]
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump(settings, f)
+
+        def crawl_home(producer, url, depth=0):
+            self.crawled.append(url)
+            producer.pages_crawled += 1
+            if url == home:
+                for i in range(3):
+                    producer.add_url(make_article(i)['url'], depth + 1)
+            return dict(make_article(0), url=url)
+
+        CrawlerProducer.crawl_url.side_effect = crawl_home
+        articles = list(iter_articles(Config(self.config_path), max_pages=20))
+
+        self.assertGreater(self.crawled.count(home), 1)
+        self.assertEqual(sorted(a['url'] for a in articles), [make_article(i)['url'] for i in range(3)])
+
+    def test_aiter_articles(self):
+        """Test async iteration over the stream"""
+        async def collect():
+            collected = []
+            async for article in aiter_articles(Config(self.config_path)):
+                collected.append(article)
+                if len(collected) == 3:
+                    break
+            return collected
+
+        collected = asyncio.run(collect())
+        self.assertEqual([a['url'] for a in collected], [make_article(i)['url'] for i in range(3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+import os
+import tempfile
+from queue import Queue
+from unittest.mock import Mock, patch
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from producer_consumer.warc import WarcWriter, iter_warc_records, find_archives, record_offsets
+from producer_consumer.replay import plan_tasks, replay_archives, response_from_record
+from producer_consumer.search_index import ArticleIndex
+from producer_consumer.crawler_consumer import ArticleConsumer
+from producer_consumer.crawler_producer import CrawlerProducer
+
+
+PAGE = '''<html><head><meta charset="utf-8"><title>Titulek</title></head>
+<body><h1 class="article-title">Testovací článek</h1>
+<div class="article-content">Obsah článku</div>
+<meta property="article:published_time" content="2024-01-01T12:00:00+00:00"/>
+</body></html>'''.encode('utf-8')
+
+
+def make_response(url, body=PAGE, headers=None):
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.reason = 'OK'
+    response.headers = CaseInsensitiveDict(headers or {'Content-Type': 'text/html; charset=utf-8',
+                                                       'Content-Encoding': 'gzip'})
+    response._content = body
+    return response
+
+
+class TestWarc(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.warc_dir = os.path.join(self.tmp_dir.name, 'warc')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_and_read_records(self):
+        """Test responses round-trip through a .warc.gz file"""
+        writer = WarcWriter(self.warc_dir)
+        writer.write_response('https://novinky.cz/clanek/1', make_response('https://novinky.cz/clanek/1'))
+        writer.write_response('https://novinky.cz/clanek/2', make_response('https://novinky.cz/clanek/2', b'x'))
+        writer.close()
+
+        archives = find_archives([self.warc_dir])
+        self.assertEqual(len(archives), 1)
+        records = list(iter_warc_records(archives[0]))
+
+        self.assertEqual([r.url for r in records], ['https://novinky.cz/clanek/1', 'https://novinky.cz/clanek/2'])
+        self.assertEqual(records[0].status_code, 200)
+        self.assertEqual(records[0].body, PAGE)
+        self.assertEqual(records[0].headers, {'Content-Type': 'text/html; charset=utf-8'})
+        self.assertEqual(records[1].body, b'x')
+
+    def test_files_roll_over(self):
+        """Test a new archive is started once max_file_size is reached"""
+        writer = WarcWriter(self.warc_dir, max_file_size=1)
+        for i in range(3):
+            writer.write_response(f'https://idnes.cz/zpravy/{i}', make_response(f'https://idnes.cz/zpravy/{i}'))
+        writer.close()
+        self.assertEqual(len(find_archives([self.warc_dir])), 3)
+
+    @patch('requests.get')
+    def test_crawl_url_records_response(self, mock_get):
+        """Test crawl_url writes fetched responses to the recorder"""
+        mock_get.return_value = make_response('https://novinky.cz/clanek/1')
+        recorder = Mock()
+        producer = CrawlerProducer('TestProducer', Queue(), 0.1, [], recorder=recorder)
+
+        producer.crawl_url('https://novinky.cz/clanek/1')
+        recorder.write_response.assert_called_once_with('https://novinky.cz/clanek/1', mock_get.return_value)
+
+    def test_replay_matches_live_extraction(self):
+        """Test replay persists the same article data a live crawl extracts"""
+        url = 'https://novinky.cz/clanek/1'
+        writer = WarcWriter(self.warc_dir)
+        writer.write_response(url, make_response(url))
+        writer.close()
+
+        consumer = ArticleConsumer('Replay', Queue(), 0, os.path.join(self.tmp_dir.name, 'out'), save_every=0)
+        stats = replay_archives([self.warc_dir], consumer, workers=1)
+
+        self.assertEqual(stats['pages'], 1)
+        live, _ = CrawlerProducer('Live', Queue(), 0, []).parse_response(url, make_response(url))
+        self.assertEqual(consumer.articles, [live])
+        self.assertEqual(consumer.articles[0]['title'], 'Testovací článek')
+        self.assertTrue(os.path.exists(consumer.articles_file))
+
+    def record_pages(self, count):
+        writer = WarcWriter(self.warc_dir)
+        for i in range(count):
+            url = f'https://novinky.cz/clanek/{i}'
+            body = PAGE.replace('Obsah článku'.encode('utf-8'), f'Obsah článku {i}'.encode('utf-8'))
+            writer.write_response(url, make_response(url, body))
+        writer.close()
+
+    def test_record_ranges(self):
+        """Test an archive can be read back in record ranges"""
+        self.record_pages(5)
+        path = find_archives([self.warc_dir])[0]
+        offsets = record_offsets(path)
+        self.assertEqual(len(offsets), 5)
+        self.assertEqual([r.url for r in iter_warc_records(path, offsets[1], offsets[3])],
+                         ['https://novinky.cz/clanek/1', 'https://novinky.cz/clanek/2'])
+        self.assertEqual(plan_tasks([path], records_per_task=2),
+                         [(path, offsets[0], offsets[2]), (path, offsets[2], offsets[4]), (path, offsets[4], None)])
+
+    def test_replay_replaces_stored_articles(self):
+        """Test replay into an existing store overwrites stored articles and their index entries"""
+        self.record_pages(2)
+        output_dir = os.path.join(self.tmp_dir.name, 'out')
+        index = ArticleIndex(os.path.join(self.tmp_dir.name, 'articles.db'))
+        consumer = ArticleConsumer('Crawl', Queue(), 0, output_dir, search_index=index, save_every=0)
+        for i in range(2):
+            consumer.save_article({'url': f'https://novinky.cz/clanek/{i}', 'title': 'Starý titulek',
+                                   'content': 'Starý obsah', 'created_at': '2024-01-01T12:00:00+00:00',
+                                   'source_website': 'novinky.cz'})
+        consumer.save_to_file()
+
+        consumer = ArticleConsumer('Replay', Queue(), 0, output_dir, search_index=index, save_every=0)
+        stats = replay_archives([self.warc_dir], consumer, workers=1)
+        self.assertEqual((stats['extracted'], stats['articles']), (2, 2))
+        self.assertEqual([a['title'] for a in consumer.articles], ['Testovací článek'] * 2)
+        self.assertEqual(len(index.search('testovaci')), 2)
+        self.assertEqual(index.search('stary'), [])
+
+        # Replaying unchanged archives again stores nothing
+        stats = replay_archives([self.warc_dir], consumer, workers=1)
+        self.assertEqual((stats['extracted'], stats['articles']), (2, 0))
+        index.close()
+
+    def test_replay_of_undated_pages_is_repeatable(self):
+        """Test pages without a date are dated by their capture time, not by the replay"""
+        undated = PAGE.replace(b'<meta property="article:published_time" content="2024-01-01T12:00:00+00:00"/>', b'')
+        writer = WarcWriter(self.warc_dir)
+        writer.write_response('https://novinky.cz/clanek/1', make_response('https://novinky.cz/clanek/1', undated))
+        writer.close()
+        captured = next(iter_warc_records(find_archives([self.warc_dir])[0])).date
+
+        consumer = ArticleConsumer('Replay', Queue(), 0, os.path.join(self.tmp_dir.name, 'out'), save_every=0)
+        self.assertEqual(replay_archives([self.warc_dir], consumer, workers=1)['articles'], 1)
+        self.assertEqual(replay_archives([self.warc_dir], consumer, workers=1)['articles'], 0)
+        self.assertEqual(consumer.articles[0]['created_at'], captured.replace('Z', '+00:00'))
+
+    def test_replay_with_worker_pool(self):
+        """Test ranges parsed by worker processes are persisted in archive order"""
+        self.record_pages(5)
+        serial = ArticleConsumer('Serial', Queue(), 0, os.path.join(self.tmp_dir.name, 'serial'), save_every=0)
+        replay_archives([self.warc_dir], serial, workers=1)
+
+        pooled = ArticleConsumer('Pooled', Queue(), 0, os.path.join(self.tmp_dir.name, 'pooled'), save_every=0)
+        stats = replay_archives([self.warc_dir], pooled, workers=2, records_per_task=2)
+        self.assertEqual((stats['pages'], stats['articles']), (5, 5))
+        self.assertEqual(pooled.articles, serial.articles)
+        self.assertEqual([a['content'] for a in pooled.articles], [f'Obsah článku {i}' for i in range(5)])
+
+    def test_response_from_record_uses_header_charset(self):
+        """Test rebuilt responses decode with the recorded charset"""
+        writer = WarcWriter(self.warc_dir)
+        writer.write_response('https://ctk.cz/clanek/1', make_response(
+            'https://ctk.cz/clanek/1', 'Žluťoučký'.encode('cp1250'), {'Content-Type': 'text/html; charset=windows-1250'}))
+        writer.close()
+
+        record = next(iter_warc_records(find_archives([self.warc_dir])[0]))
+        self.assertEqual(response_from_record(record).text, 'Žluťoučký')
+
+
+if __name__ == '__main__':
+    unittest.main()